@@ -76,12 +76,51 @@ from .editor_toolbar import init as _init_toolbar
 _init_toolbar()
 
 
+# ─── Config Change Handling ───────────────────────────────────────
+
+def _on_config_updated(_new_config):
+    """Invalidate cached config when edited via Anki's config editor."""
+    from .card_processor import invalidate_config
+    invalidate_config()
+
+
+mw.addonManager.setConfigUpdatedAction(__name__, _on_config_updated)
+
+
+# ─── Startup: Pre-warm LLM Connection ─────────────────────────────
+
+def _prewarm_client():
+    """Open the provider connection in the background at profile load.
+
+    The first generation then reuses the pooled, already-handshaken
+    socket instead of paying TCP+TLS setup on the critical path.
+    """
+    from .card_processor import get_config, get_llm_client
+
+    def task():
+        get_llm_client(get_config()).prewarm()
+
+    mw.taskman.run_in_background(task)
+
+
+gui_hooks.profile_did_open.append(lambda: _prewarm_client())
+
+
 # ─── Menu: Settings Dialog ────────────────────────────────────────
 
 def _open_settings():
-    """Open the LLM Field Generator settings dialog."""
+    """Open the LLM Field Generator settings dialog.
+
+    The dialog instance is built once and recycled: second and later
+    opens skip the whole widget-tree construction.
+    """
     from .gui.settings_dialog import SettingsDialog
-    dialog = SettingsDialog(mw)
+    dialog = getattr(mw, "_llm_settings_dialog", None)
+    if dialog is None:
+        dialog = SettingsDialog(mw)
+        mw._llm_settings_dialog = dialog
+    else:
+        dialog.prepare_reopen()
     dialog.exec()
 
 
@@ -4,6 +4,9 @@
 # Adds "LLM Fill Selected Notes" to the Browser's Edit menu.
 # Shows a progress dialog during LLM processing.
 
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import TYPE_CHECKING, Sequence, List
 
 from anki.collection import Collection, OpChanges
@@ -14,6 +17,7 @@ from aqt.utils import showInfo, tooltip
 
 from .card_processor import (
     ADDON_NAME,
+    UPDATE_CHUNK_SIZE,
     get_config,
     should_process_note,
     generate_fields_for_note,
@@ -25,6 +29,11 @@ if TYPE_CHECKING:
 
 ACTION_NAME = f"{ADDON_NAME}: Fill selected notes"
 
+# Minimum interval between progress ticks. Each tick is a queued
+# cross-thread Qt signal; cache hits can finish notes in microseconds, so
+# emitting per note would flood the event loop. ~20 Hz is plenty smooth.
+TICK_INTERVAL_NS = 50_000_000
+
 
 # ─── Background Worker with Progress ──────────────────────────────
 
@@ -40,46 +49,94 @@ class BulkLLMWorker(QThread):
         super().__init__(**kwargs)
         self._notes_and_mappings = notes_and_mappings
         self._config = config
-        self._cancel = False
+        # Event (not a bool) so in-flight HTTP reads can poll it too
+        self._cancel_evt = threading.Event()
+        # Field-name → index per note type, resolved once up front so the
+        # run loop can index note.fields directly instead of paying the
+        # name lookup in Note.__getitem__ for every note.
+        self._field_idx: dict = {}
+        for note, _mapping in notes_and_mappings:
+            if note.mid in self._field_idx:
+                continue
+            note_type = note.note_type()
+            self._field_idx[note.mid] = (
+                {f["name"]: f["ord"] for f in note_type["flds"]}
+                if note_type else {}
+            )
 
     def run(self):
         try:
-            results = []
             total = len(self._notes_and_mappings)
-
-            for i, (note, mapping) in enumerate(self._notes_and_mappings):
-                if self._cancel:
-                    self.tick.emit(i, total, "Cancelled.")
-                    return
-
-                # Support both old (source_field) and new (source_fields) format
-                source_field = mapping.get("source_field", "")
-                source_fields = mapping.get("source_fields", [])
-                if source_field and not source_fields:
-                    source_fields = [source_field]
-                
-                # Get content from first non-empty source field for preview
-                source = ""
-                for sf in source_fields:
-                    if note[sf].strip():
-                        source = note[sf]
-                        break
-                
-                # Truncate long source text for display
-                preview = source[:30] + "..." if len(source) > 30 else source
-                self.tick.emit(i, total, f"[{i+1}/{total}] Generating: {preview}")
-
-                generated = generate_fields_for_note(
-                    note, mapping, self._config
-                )
-                results.append((note, generated))
+            # LLM calls are network-bound, so run several concurrently.
+            # Each worker thread blocks on its HTTP request while others
+            # keep the LLM server's queue full.
+            max_workers = max(1, self._config.get("parallel_requests", 4))
+
+            results: List[tuple] = [None] * total  # keep input order
+            done = 0
+            last_emit_ns = 0  # throttle progress ticks (see TICK_INTERVAL_NS)
+            # Shared across workers so identical prompts within the batch
+            # are only sent to the LLM once; the key is claimed before
+            # dispatch, so concurrent duplicates wait on the first call.
+            memo: dict = {}
+
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                futures = {
+                    executor.submit(
+                        generate_fields_for_note, note, mapping, self._config,
+                        memo=memo, cancel_evt=self._cancel_evt,
+                    ): i
+                    for i, (note, mapping) in enumerate(self._notes_and_mappings)
+                }
+
+                for future in as_completed(futures):
+                    i = futures[future]
+                    note, mapping = self._notes_and_mappings[i]
+
+                    if self._cancel_evt.is_set():
+                        for pending in futures:
+                            pending.cancel()
+                        self.tick.emit(done, total, "Cancelled.")
+                        return
+
+                    results[i] = (note, future.result())
+                    done += 1
+                    now = time.monotonic_ns()
+                    if done == total or now - last_emit_ns > TICK_INTERVAL_NS:
+                        last_emit_ns = now
+                        self.tick.emit(
+                            done, total,
+                            f"[{done}/{total}] Generated: {self._preview(note, mapping)}",
+                        )
 
             self.finished_ok.emit(results)
         except Exception as e:
             self.finished_err.emit(str(e))
 
+    def _preview(self, note: "Note", mapping: dict) -> str:
+        """Short source-text preview for the progress dialog."""
+        # Support both old (source_field) and new (source_fields) format
+        source_field = mapping.get("source_field", "")
+        source_fields = mapping.get("source_fields", [])
+        if source_field and not source_fields:
+            source_fields = [source_field]
+
+        # Content from the first non-empty source field, via the
+        # precomputed field indices
+        fmap = self._field_idx.get(note.mid, {})
+        source = ""
+        for sf in source_fields:
+            idx = fmap.get(sf)
+            value = note.fields[idx] if idx is not None else note[sf]
+            if value.strip():
+                source = value
+                break
+
+        # Truncate long source text for display
+        return source[:30] + "..." if len(source) > 30 else source
+
     def cancel(self):
-        self._cancel = True
+        self._cancel_evt.set()
 
 
 # ─── Main Entry Point ─────────────────────────────────────────────
@@ -94,7 +151,8 @@ def _fill_selected_notes(nids: Sequence["NoteId"], parent: "Browser") -> None:
         tooltip("No notes selected.", parent=parent)
         return
 
-    # Collect notes with valid mappings
+    # Collect notes with valid mappings (mapping resolution is cached per
+    # note type inside should_process_note)
     notes_and_mappings = []
     for nid in nids:
         try:
@@ -159,8 +217,9 @@ def _fill_selected_notes(nids: Sequence["NoteId"], parent: "Browser") -> None:
                     for field_name, value in generated.items():
                         note[field_name] = value
                     to_update.append(note)
-            if to_update:
-                col.update_notes(to_update)
+            # Chunked writes under one undo entry (see _apply_and_save_batch_op)
+            for start in range(0, len(to_update), UPDATE_CHUNK_SIZE):
+                col.update_notes(to_update[start:start + UPDATE_CHUNK_SIZE])
             return col.merge_undo_entries(pos)
 
         CollectionOp(
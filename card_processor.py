@@ -7,13 +7,17 @@
 # - This prevents blocking Anki during slow LLM network requests
 
 import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import TYPE_CHECKING, Optional, List
 
 from anki.collection import Collection, OpChanges
 from aqt import mw
 from aqt.operations import CollectionOp, QueryOp
+from aqt.qt import QTimer
 from aqt.utils import tooltip, showInfo
 
+from . import llm_cache
 from .llm_client import LLMClient, LLMError
 from .prompt_builder import build_prompt, get_note_fields_dict
 
@@ -30,17 +34,59 @@ _is_processing = False
 # ─── Config Helpers ────────────────────────────────────────────────
 
 
+# Parsed config, cached because addonManager.getConfig re-reads JSON from
+# disk on every call and bulk workflows ask for the config per note.
+# Invalidated when the settings dialog (or Anki's config editor) writes.
+_config_cache: Optional[dict] = None
+
+
 def get_config() -> dict:
-    """Get addon config from Anki's addon manager."""
-    assert mw is not None
-    package = __name__.split(".")[0]
-    config = mw.addonManager.getConfig(package)
-    return config or {}
+    """Get addon config from Anki's addon manager (cached)."""
+    global _config_cache
+    if _config_cache is None:
+        assert mw is not None
+        package = __name__.split(".")[0]
+        _config_cache = mw.addonManager.getConfig(package) or {}
+    return _config_cache
+
+
+def invalidate_config() -> None:
+    """Drop cached config state. Call after the config is written."""
+    global _config_cache
+    _config_cache = None
+    invalidate_mapping_cache()
+
+
+@functools.lru_cache(maxsize=4)
+def _cached_client(
+    base_url: str,
+    model: str,
+    temperature: float,
+    max_tokens: int,
+    api_key: str,
+    timeout: int,
+    api_mode: str,
+) -> LLMClient:
+    """Build (or reuse) an LLMClient for a given settings tuple.
+
+    One client per settings combination instead of one per note, so batch
+    fills share connection state instead of re-creating it per call.
+    A config change produces a new key and therefore a fresh client.
+    """
+    return LLMClient(
+        base_url=base_url,
+        model=model,
+        temperature=temperature,
+        max_tokens=max_tokens,
+        api_key=api_key,
+        timeout=timeout,
+        api_mode=api_mode,
+    )
 
 
 def get_llm_client(config: dict) -> LLMClient:
-    """Create an LLMClient from the addon config."""
-    return LLMClient(
+    """Get a shared LLMClient for the addon config."""
+    return _cached_client(
         base_url=config.get("api_base_url", "http://localhost:11434"),
         model=config.get("model", "llama3.2"),
         temperature=config.get("temperature", 0.7),
@@ -58,6 +104,36 @@ ALL_TRIGGERS = ["mining", "add_cards", "browse", "focus_lost", "toolbar"]
 
 # ─── Note Matching ─────────────────────────────────────────────────
 
+# Mapping resolution only depends on the note type and trigger, and note
+# types change rarely — cache it so bulk workflows don't re-walk the config
+# and field lists for every note. Keyed by (note type id, mod, trigger);
+# cleared when the settings dialog saves.
+_mapping_cache: dict = {}
+
+
+def invalidate_mapping_cache() -> None:
+    """Drop cached mapping resolutions. Call after the config changes."""
+    _mapping_cache.clear()
+
+
+# Field-name tuples and name → index maps per note type, keyed by
+# (id, mod) so schema edits naturally miss. Saves note.keys() building a
+# fresh list on every focus change.
+_field_names_cache: dict = {}
+
+
+def _note_type_fields(note_type: dict) -> tuple:
+    """Return cached (field_names, name_to_index) for a note type."""
+    key = (note_type["id"], note_type["mod"])
+    cached = _field_names_cache.get(key)
+    if cached is None:
+        names = tuple(f["name"] for f in note_type["flds"])
+        cached = (names, {name: i for i, name in enumerate(names)})
+        if len(_field_names_cache) > 256:
+            _field_names_cache.clear()
+        _field_names_cache[key] = cached
+    return cached
+
 
 def should_process_note(
     note: "Note", config: dict, trigger: str = ""
@@ -78,6 +154,23 @@ def should_process_note(
     if note_type is None:
         return None
 
+    cache_key = (note_type["id"], note_type["mod"], trigger)
+    try:
+        return _mapping_cache[cache_key]
+    except KeyError:
+        pass
+
+    mapping = _resolve_mapping(note_type, config, trigger)
+    if len(_mapping_cache) > 256:
+        _mapping_cache.clear()
+    _mapping_cache[cache_key] = mapping
+    return mapping
+
+
+def _resolve_mapping(
+    note_type: dict, config: dict, trigger: str
+) -> Optional[dict]:
+    """Uncached mapping resolution for a note type + trigger."""
     note_type_name = note_type["name"]
     mappings = config.get("note_type_mappings", {})
 
@@ -93,7 +186,7 @@ def should_process_note(
             return None
 
     # Validate that fields exist on this note type
-    field_names = [f["name"] for f in note_type["flds"]]
+    field_names, _ = _note_type_fields(note_type)
     
     # Support both old (source_field) and new (source_fields) format
     source_field = mapping.get("source_field", "")
@@ -122,8 +215,66 @@ def should_process_note(
 # ─── Core Processing (runs WITHOUT collection lock) ────────────────
 
 
+class _InFlight:
+    """Memo entry for a prompt whose LLM call is still running.
+
+    The entry is published before the request fires, so duplicate
+    prompts dispatched concurrently (parallel bulk fills of imported
+    decks repeating a sentence) wait on the first call's result
+    instead of re-issuing it. result stays None if the call failed.
+    """
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Optional[str] = None
+
+
+_memo_lock = threading.Lock()
+
+
+def _memo_claim(
+    memo: dict, key, cancel_evt: Optional[threading.Event] = None
+):
+    """Look up a memoized result or claim the key for this caller.
+
+    Returns (result, None) when another call already produced (or is
+    producing) the value, or (None, entry) when this caller now owns
+    the key and must resolve entry via _memo_resolve. Returns
+    (None, None) if cancelled while waiting. A failed call releases
+    its claim, so a waiter loops back to retry the key itself.
+    """
+    while True:
+        with _memo_lock:
+            entry = memo.get(key)
+            if entry is None:
+                entry = _InFlight()
+                memo[key] = entry
+                return None, entry
+        while not entry.done.wait(0.2):
+            if cancel_evt is not None and cancel_evt.is_set():
+                return None, None
+        if entry.result is not None:
+            return entry.result, None
+
+
+def _memo_resolve(memo: dict, key, entry: _InFlight, result: Optional[str]) -> None:
+    """Publish a claimed call's outcome and wake any waiters.
+
+    A None result (failed call) drops the reservation so a later
+    duplicate can retry rather than inheriting the failure.
+    """
+    entry.result = result
+    if result is None:
+        with _memo_lock:
+            if memo.get(key) is entry:
+                del memo[key]
+    entry.done.set()
+
+
 def generate_fields_for_note(
-    note: "Note", mapping: dict, config: dict, overwrite: bool = False
+    note: "Note", mapping: dict, config: dict, overwrite: bool = False,
+    memo: Optional[dict] = None, cancel_evt: Optional[threading.Event] = None,
+    on_partial=None,
 ) -> dict:
     """Generate LLM content for a note's target fields.
 
@@ -132,6 +283,17 @@ def generate_fields_for_note(
 
     Runs outside the collection lock so slow LLM calls don't block Anki.
 
+    Args:
+        memo: Optional {(system_prompt, prompt): _InFlight} dict shared
+            across a batch so identical prompts (common with imported
+            decks that share sentences) are only sent to the LLM once,
+            even when the duplicates run concurrently.
+        cancel_evt: Optional event that aborts remaining work (including
+            in-flight HTTP reads) when set by a cancelled bulk operation.
+        on_partial: Optional (field_name, partial_text) callback invoked
+            from the worker thread as streamed output arrives (Ollama
+            only); lets the editor show content at time-to-first-token.
+
     Returns:
         Dict of {field_name: generated_text} for fields that were generated.
     """
@@ -148,6 +310,19 @@ def generate_fields_for_note(
     target_fields = mapping.get("target_fields", [])
     system_prompt = mapping.get("system_prompt", "")
 
+    # Semantic cache: reuse responses for near-duplicate prompts.
+    # Global setting with optional per-mapping override.
+    semantic_enabled = mapping.get(
+        "semantic_cache", config.get("semantic_cache_enabled", False)
+    )
+    semantic_threshold = config.get(
+        "semantic_cache_threshold", llm_cache.DEFAULT_SEMANTIC_THRESHOLD
+    )
+    embedding_model = config.get(
+        "embedding_model", llm_cache.DEFAULT_EMBEDDING_MODEL
+    )
+    embedding_base_url = config.get("api_base_url", "http://localhost:11434")
+
     # Check if at least one source field has content
     has_source_content = False
     for sf in source_fields:
@@ -162,6 +337,9 @@ def generate_fields_for_note(
     generated = {}
 
     for target in target_fields:
+        if cancel_evt is not None and cancel_evt.is_set():
+            break
+
         field_name = target["field_name"]
         prompt_template = target["prompt_template"]
 
@@ -171,20 +349,94 @@ def generate_fields_for_note(
 
         prompt = build_prompt(prompt_template, note_fields)
 
+        # In-batch dedup: another note in this batch already produced,
+        # or is currently producing, the same prompt. Claiming the key
+        # before dispatch means concurrent duplicates wait on the first
+        # call instead of firing their own.
+        memo_key = (system_prompt, prompt)
+        claimed = None
+        if memo is not None:
+            hit, claimed = _memo_claim(memo, memo_key, cancel_evt)
+            if hit is not None:
+                generated[field_name] = hit
+                continue
+            if claimed is None:  # cancelled while waiting
+                break
+
+        # Everything after a successful claim runs under one finally:
+        # an unexpected error in the cache checks would otherwise leak
+        # the reservation, and _memo_claim's wait has no timeout — every
+        # waiter on the same prompt would hang for good.
         try:
-            api_mode = config.get("api_mode", "ollama")
-            if api_mode == "groq":
-                result = client.generate_groq(prompt, system_prompt)
-            elif api_mode == "gemini":
-                result = client.generate_gemini(prompt, system_prompt)
-            elif api_mode == "openrouter":
-                result = client.generate_openrouter(prompt, system_prompt)
-            else:
-                result = client.generate(prompt, system_prompt)
-            generated[field_name] = result
-        except LLMError as e:
-            # Log error but continue with other fields
-            print(f"[LLM Fill] Error generating field '{field_name}': {e}")
+            # Exact-match cache: identical (model, prompts, temperature)
+            # requests skip the LLM round-trip entirely.
+            cache_enabled = config.get("cache_enabled", True)
+            # The key doubles as the semantic entry's primary key, so it
+            # is computed whenever either cache is on; deriving it only
+            # for the exact-match cache would collapse semantic_put onto
+            # one row.
+            cache_key = ""
+            if cache_enabled or semantic_enabled:
+                cache_key = llm_cache.make_key(
+                    client.model, system_prompt, prompt, client.temperature
+                )
+            if cache_enabled:
+                cached = llm_cache.get(cache_key)
+                if cached is not None:
+                    generated[field_name] = cached
+                    if claimed is not None:
+                        _memo_resolve(memo, memo_key, claimed, cached)
+                    continue
+
+            # Semantic cache: embed the prompt and reuse a near-duplicate's
+            # response if similarity clears the threshold.
+            embedding = None
+            if semantic_enabled:
+                embedding = llm_cache.embed(
+                    embedding_base_url, embedding_model, prompt
+                )
+                if embedding is not None:
+                    similar = llm_cache.semantic_get(
+                        embedding, semantic_threshold, model=embedding_model
+                    )
+                    if similar is not None:
+                        generated[field_name] = similar
+                        if claimed is not None:
+                            _memo_resolve(memo, memo_key, claimed, similar)
+                        continue
+
+            try:
+                if on_partial is not None:
+                    result = client.generate_stream(
+                        prompt, system_prompt,
+                        on_delta=lambda text, _fn=field_name: on_partial(_fn, text),
+                        cancel_evt=cancel_evt,
+                    )
+                else:
+                    result = client.generate_for_mode(
+                        prompt, system_prompt, cancel_evt=cancel_evt
+                    )
+                generated[field_name] = result
+                if claimed is not None:
+                    _memo_resolve(memo, memo_key, claimed, result)
+                if cache_enabled:
+                    llm_cache.put(
+                        cache_key, result, config.get("cache_max_entries", llm_cache.DEFAULT_MAX_ENTRIES)
+                    )
+                if embedding is not None:
+                    llm_cache.semantic_put(
+                        cache_key, embedding, result,
+                        config.get("cache_max_entries", llm_cache.DEFAULT_MAX_ENTRIES),
+                        model=embedding_model,
+                    )
+            except LLMError as e:
+                # Log error but continue with other fields
+                print(f"[LLM Fill] Error generating field '{field_name}': {e}")
+        finally:
+            # Never leave a claim unresolved: a stuck reservation would
+            # block every waiter on the same prompt.
+            if claimed is not None and not claimed.done.is_set():
+                _memo_resolve(memo, memo_key, claimed, None)
 
     return generated
 
@@ -202,20 +454,48 @@ def _apply_and_save_op(col: Collection, note: "Note", generated: dict) -> OpChan
     return col.merge_undo_entries(pos)
 
 
+# How many notes to write per update_notes call during batch saves.
+# One giant update_notes holds the DB for the whole write; chunking keeps
+# individual transactions short while merge_undo_entries still collapses
+# everything into a single undo step.
+UPDATE_CHUNK_SIZE = 500
+
+
 def _apply_and_save_batch_op(
     col: Collection, results: List[tuple]
 ) -> OpChanges:
-    """Apply generated fields to multiple notes and save with undo."""
+    """Apply generated fields to multiple notes and save with undo.
+
+    Writes in chunks of UPDATE_CHUNK_SIZE under one custom undo entry, so
+    very large batch fills neither lock the DB in one long transaction nor
+    fragment the user's undo history.
+    """
     count = len(results)
     pos = col.add_custom_undo_entry(f"{ADDON_NAME}: Batch fill {count} notes")
     to_update = []
+    # Resolve field indices once per note type; Note.__setitem__ pays the
+    # name → index lookup on every assignment otherwise.
+    idx_by_mid: dict = {}
     for note, generated in results:
-        if generated:
-            for field_name, value in generated.items():
+        if not generated:
+            continue
+        fmap = idx_by_mid.get(note.mid)
+        if fmap is None:
+            note_type = note.note_type()
+            fmap = (
+                {f["name"]: f["ord"] for f in note_type["flds"]}
+                if note_type else {}
+            )
+            idx_by_mid[note.mid] = fmap
+        for field_name, value in generated.items():
+            idx = fmap.get(field_name)
+            if idx is not None:
+                note.fields[idx] = value
+            else:
                 note[field_name] = value
-            to_update.append(note)
-    if to_update:
-        col.update_notes(to_update)
+        to_update.append(note)
+    for start in range(0, len(to_update), UPDATE_CHUNK_SIZE):
+        col.update_notes(to_update[start:start + UPDATE_CHUNK_SIZE])
     return col.merge_undo_entries(pos)
 
 
@@ -296,6 +576,12 @@ def on_note_will_be_added(
 # We need to track the current editor reference for loadNoteKeepingFocus
 _current_editor = None
 
+# Focus-lost debounce state: pending fills keyed by note id (a re-trigger
+# for the same note replaces the earlier one), flushed by a single-shot
+# timer created lazily on the main thread.
+_pending_focus_fills: dict = {}
+_focus_debounce_timer = None
+
 
 def set_editor(editor) -> None:
     """Track the current editor instance (set via editor_did_init hook)."""
@@ -318,12 +604,10 @@ def on_focus_lost(changed: bool, note: "Note", field_idx: int) -> bool:
 
     Returns changed flag immediately (does not block for LLM).
     """
-    global _is_processing
-    
     # Prevent re-entrancy
     if _is_processing:
         return changed
-    
+
     assert mw is not None
     config = get_config()
 
@@ -337,10 +621,10 @@ def on_focus_lost(changed: bool, note: "Note", field_idx: int) -> bool:
     if source_field and not source_fields:
         source_fields = [source_field]
 
+    field_names, field_index = _note_type_fields(note.note_type())
     try:
-        field_names = note.keys()
         unfocused_field = field_names[field_idx]
-    except (IndexError, KeyError):
+    except IndexError:
         return changed
 
     # Only trigger if the unfocused field is one of the source fields
@@ -350,7 +634,8 @@ def on_focus_lost(changed: bool, note: "Note", field_idx: int) -> bool:
     # Don't trigger if all source fields are empty
     has_source_content = False
     for sf in source_fields:
-        if note[sf].strip():
+        idx = field_index.get(sf)
+        if idx is not None and note.fields[idx].strip():
             has_source_content = True
             break
 
@@ -361,18 +646,44 @@ def on_focus_lost(changed: bool, note: "Note", field_idx: int) -> bool:
     target_fields = mapping.get("target_fields", [])
     has_empty = False
     for target in target_fields:
-        fname = target.get("field_name", "")
-        if fname in field_names:
+        idx = field_index.get(target.get("field_name", ""))
+        if idx is not None:
             should_overwrite = target.get("overwrite", False)
-            if should_overwrite or not note[fname].strip():
+            if should_overwrite or not note.fields[idx].strip():
                 has_empty = True
                 break
 
     if not has_empty:
         return changed
 
-    # Async LLM call: two-phase approach
-    editor_ref = _current_editor
+    # Debounce: users often tab back in to keep editing. Collapse rapid
+    # tab-outs into a single LLM call once the field has been left alone
+    # for focus_lost_debounce_ms.
+    _pending_focus_fills[note.id] = (note, mapping, config, _current_editor)
+    global _focus_debounce_timer
+    if _focus_debounce_timer is None:
+        _focus_debounce_timer = QTimer(mw)
+        _focus_debounce_timer.setSingleShot(True)
+        _focus_debounce_timer.timeout.connect(_flush_pending_focus_fills)
+    _focus_debounce_timer.start(config.get("focus_lost_debounce_ms", 800))
+
+    return changed
+
+
+def _flush_pending_focus_fills() -> None:
+    """Run the LLM fills queued by the focus-lost debounce timer."""
+    pending = list(_pending_focus_fills.values())
+    _pending_focus_fills.clear()
+    for note, mapping, config, editor_ref in pending:
+        _start_focus_fill(note, mapping, config, editor_ref)
+
+
+def _start_focus_fill(note: "Note", mapping: dict, config: dict, editor_ref) -> None:
+    """Async LLM fill for a focus-lost trigger: QueryOp → CollectionOp."""
+    global _is_processing
+
+    if _is_processing:
+        return
     _is_processing = True
 
     def do_llm(_col) -> dict:
@@ -408,8 +719,6 @@ def on_focus_lost(changed: bool, note: "Note", field_idx: int) -> bool:
         lambda exc: tooltip(f"LLM Fill error: {exc}", parent=mw) or reset_processing(),
     ).without_collection().run_in_background()
 
-    return changed
-
 
 def reset_processing():
     """Reset the processing flag."""
@@ -423,36 +732,71 @@ def reset_processing():
 def run_batch_fill(parent=None, overwrite: bool = False):
     """Find notes with empty target fields and fill via LLM.
 
-    Two-phase approach:
-    1. QueryOp: Process all notes (LLM calls, no lock)
-    2. CollectionOp: Save all results (with lock + undo)
+    Three-phase approach:
+    1. QueryOp (collection): Discover candidate notes off the UI thread
+    2. QueryOp (no lock): Generate all fields via LLM
+    3. CollectionOp: Save all results (with lock + undo)
     """
     assert mw is not None
 
     config = get_config()
-    notes_and_mappings = find_notes_with_empty_targets(config)
     _parent = parent or mw
 
-    if not notes_and_mappings:
-        showInfo(
-            "No notes found with empty target fields.\n\n"
-            "Make sure you have:\n"
-            "1. Configured field mappings in Settings\n"
-            "2. Notes with non-empty source fields and empty target fields",
-            parent=_parent,
-        )
-        return
-
-    count = len(notes_and_mappings)
-    tooltip(f"Starting LLM batch fill for {count} note(s)...", parent=_parent)
+    def do_discovery(col: Collection) -> List[tuple]:
+        """Phase 0: Find candidate notes (worker thread, collection lock).
+
+        Scanning can issue hundreds of get_note calls; running it here
+        keeps the main Qt thread responsive.
+        """
+        return find_notes_with_empty_targets(col, config)
+
+    def on_discovered(notes_and_mappings: List[tuple]):
+        if not notes_and_mappings:
+            showInfo(
+                "No notes found with empty target fields.\n\n"
+                "Make sure you have:\n"
+                "1. Configured field mappings in Settings\n"
+                "2. Notes with non-empty source fields and empty target fields",
+                parent=_parent,
+            )
+            return
 
-    def do_batch_llm(_col) -> List[tuple]:
-        """Phase 1: Generate all fields via LLM (no collection lock)."""
-        results = []
-        for note, mapping in notes_and_mappings:
-            generated = generate_fields_for_note(note, mapping, config, overwrite=overwrite)
-            results.append((note, generated))
-        return results
+        count = len(notes_and_mappings)
+        tooltip(f"Starting LLM batch fill for {count} note(s)...", parent=_parent)
+        _start_batch_llm(notes_and_mappings)
+
+    def _start_batch_llm(notes_and_mappings: List[tuple]):
+        def do_batch_llm(_col) -> List[tuple]:
+            """Phase 1: Generate all fields via LLM (no collection lock).
+
+            Network-bound, so notes are dispatched concurrently through a
+            bounded thread pool (parallel_requests), same as the browser
+            bulk fill. Results keep input order.
+            """
+            memo: dict = {}  # dedupe identical prompts across the batch
+            max_workers = max(1, config.get("parallel_requests", 4))
+            results: List[tuple] = [None] * len(notes_and_mappings)
+
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                futures = {
+                    executor.submit(
+                        generate_fields_for_note, note, mapping, config,
+                        overwrite=overwrite, memo=memo,
+                    ): i
+                    for i, (note, mapping) in enumerate(notes_and_mappings)
+                }
+                for future in as_completed(futures):
+                    i = futures[future]
+                    results[i] = (notes_and_mappings[i][0], future.result())
+            return results
+
+        QueryOp(
+            parent=_parent,
+            op=do_batch_llm,
+            success=on_batch_done,
+        ).failure(
+            on_batch_error,
+        ).without_collection().run_in_background()
 
     def on_batch_done(results: List[tuple]):
         """Phase 2: Save all results with undo."""
@@ -478,26 +822,44 @@ def run_batch_fill(parent=None, overwrite: bool = False):
 
     QueryOp(
         parent=_parent,
-        op=do_batch_llm,
-        success=on_batch_done,
+        op=do_discovery,
+        success=on_discovered,
     ).failure(
         on_batch_error,
-    ).without_collection().run_in_background()
+    ).run_in_background()
 
 
 # ─── Note Discovery ───────────────────────────────────────────────
 
 
 def find_notes_with_empty_targets(
-    config: dict, deck_id: Optional[int] = None
+    col: Collection, config: dict, deck_id: Optional[int] = None
 ) -> List[tuple]:
     """Find notes with empty target fields and matching mappings."""
-    assert mw is not None
     mappings = config.get("note_type_mappings", {})
     if not mappings:
         return []
 
     results = []
+    seen_ids: set = set()
+
+    # deck: search semantics — the deck itself plus its subdecks, and
+    # cards sitting in a filtered deck matched via their home deck
+    # (odid). Resolved once; the set is the same for every mapping.
+    allowed_nids = None
+    if deck_id is not None:
+        try:
+            dids = list(col.decks.deck_and_child_ids(deck_id))
+        except AttributeError:
+            dids = [deck_id] + [child_id for _, child_id in col.decks.children(deck_id)]
+        marks = ",".join("?" * len(dids))
+        allowed_nids = set(
+            col.db.list(
+                f"SELECT nid FROM cards WHERE did IN ({marks})"
+                f" OR odid IN ({marks})",
+                *dids, *dids,
+            )
+        )
 
     for note_type_name, mapping in mappings.items():
         # Support both old (source_field) and new (source_fields) format
@@ -511,38 +873,52 @@ def find_notes_with_empty_targets(
         if not source_fields or not target_fields:
             continue
 
-        for target in target_fields:
-            field_name = target.get("field_name", "")
-            if not field_name:
+        note_type = col.models.by_name(note_type_name)
+        if note_type is None:
+            continue
+
+        # Resolve field names to their slot in the \x1f-separated flds
+        # column so candidates can be filtered from a single table read,
+        # instead of one find_notes search per target field.
+        field_idx = {f["name"]: f["ord"] for f in note_type["flds"]}
+        source_idxs = [field_idx[sf] for sf in source_fields if sf in field_idx]
+        target_idxs = [
+            field_idx[t["field_name"]]
+            for t in target_fields
+            if t.get("field_name", "") in field_idx
+        ]
+        if not source_idxs or not target_idxs:
+            continue
+
+        try:
+            rows = col.db.all(
+                "SELECT id, flds FROM notes WHERE mid = ?", note_type["id"]
+            )
+        except Exception:
+            continue
+
+        for nid, flds in rows:
+            if nid in seen_ids:
+                continue
+            if allowed_nids is not None and nid not in allowed_nids:
                 continue
 
-            query = f'"note:{note_type_name}" "{field_name}:"'
-            if deck_id is not None:
-                deck = mw.col.decks.get(deck_id)
-                if deck:
-                    query = f'"deck:{deck["name"]}" {query}'
+            parts = flds.split("\x1f")
+            # At least one source field with content...
+            if not any(
+                parts[i].strip() for i in source_idxs if i < len(parts)
+            ):
+                continue
+            # ...and at least one empty target field
+            if not any(
+                i < len(parts) and not parts[i].strip() for i in target_idxs
+            ):
+                continue
 
+            seen_ids.add(nid)
             try:
-                note_ids = mw.col.find_notes(query)
+                results.append((col.get_note(nid), mapping))
             except Exception:
                 continue
 
-            for nid in note_ids:
-                try:
-                    note = mw.col.get_note(nid)
-                    # Check if at least one source field has content
-                    has_source = any(note[sf].strip() for sf in source_fields)
-                    if has_source:
-                        results.append((note, mapping))
-                except Exception:
-                    continue
-
-    # Deduplicate by note id
-    seen_ids: set = set()
-    unique_results = []
-    for note, mapping in results:
-        if note.id not in seen_ids:
-            seen_ids.add(note.id)
-            unique_results.append((note, mapping))
-
-    return unique_results
+    return results
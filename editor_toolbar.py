@@ -9,6 +9,7 @@
 # - editor_did_init_buttons hook for registration
 # - CollectionOp + QueryOp for async undo-safe processing
 
+import time
 from typing import TYPE_CHECKING, Callable, NamedTuple, Optional
 
 from anki.collection import Collection, OpChanges
@@ -74,17 +75,68 @@ def _llm_fill_note(editor: Editor, overwrite: bool = False) -> None:
     action = "Regenerate" if overwrite else "Fill"
     tooltip(f"LLM {action}: generating...", parent=editor.widget)
 
+    # Streamed partial output (Ollama): push the accumulated text into the
+    # editor every ~300ms so the user sees content at time-to-first-token.
+    # Only the final result is committed via CollectionOp below.
+    last_partial = [0.0]
+    # Original values of fields we stream into, so a failed stream can
+    # roll the editor back — partial text must not linger looking like
+    # a finished completion (in Add Cards it could even be saved).
+    original_values: dict = {}
+
+    def on_partial(field_name: str, text: str) -> None:
+        if field_name not in original_values:
+            original_values[field_name] = note[field_name]
+        now = time.monotonic()
+        if now - last_partial[0] < 0.3:
+            return
+        last_partial[0] = now
+
+        def show():
+            try:
+                note[field_name] = text
+                editor.loadNoteKeepingFocus()
+            except Exception:
+                pass
+
+        assert mw is not None
+        mw.taskman.run_on_main(show)
+
+    def restore_partials() -> None:
+        """Put back the pre-stream field values and refresh the editor."""
+        if not original_values:
+            return
+
+        def restore():
+            try:
+                for field_name, value in original_values.items():
+                    note[field_name] = value
+                editor.loadNoteKeepingFocus()
+            except Exception:
+                pass
+
+        assert mw is not None
+        mw.taskman.run_on_main(restore)
+
     def do_llm(_col) -> dict:
-        return generate_fields_for_note(note, mapping, config, overwrite=overwrite)
+        return generate_fields_for_note(
+            note, mapping, config, overwrite=overwrite, on_partial=on_partial
+        )
 
     def on_done(generated: dict):
         if not generated:
+            restore_partials()
             tooltip("Nothing to generate (all fields already filled).", parent=editor.widget)
             reset_processing()
             return
 
         def save_op(col: Collection) -> OpChanges:
             pos = col.add_custom_undo_entry(f"{ADDON_NAME}: {action} fields")
+            # A field whose stream failed while others succeeded is not
+            # in generated; roll its partial text back before saving.
+            for field_name, value in original_values.items():
+                if field_name not in generated:
+                    note[field_name] = value
             for field_name, value in generated.items():
                 note[field_name] = value
             _carefully_update_note(col, note)
@@ -105,6 +157,7 @@ def _llm_fill_note(editor: Editor, overwrite: bool = False) -> None:
         ).success(on_saved).run_in_background()
 
     def on_error(exc: Exception):
+        restore_partials()
         tooltip(f"LLM {action} error: {exc}", parent=editor.widget)
         reset_processing()
 
@@ -1,9 +1,15 @@
 # Anki LLM Field Generator
 # Settings dialog — QDialog-based settings with field mapping
 
+import copy
+import functools
+import time
+import weakref
 from typing import TYPE_CHECKING, Optional, List
 
 from aqt.qt import (
+    pyqtSlot,
+    QEvent,
     QDialog,
     QVBoxLayout,
     QHBoxLayout,
@@ -24,11 +30,17 @@ from aqt.qt import (
     QSizePolicy,
     Qt,
     QFrame,
-    QListWidget,
-    QListWidgetItem,
+    QListView,
+    QAbstractListModel,
+    QModelIndex,
+    QTimer,
 )
+from aqt.gui_hooks import profile_will_close
 from aqt.utils import restoreGeom, saveGeom, tooltip, showInfo
 
+from ..llm_client import LLMClient
+from ..prompt_builder import compile_template
+
 if TYPE_CHECKING:
     from aqt.main import AnkiQt
 
@@ -36,35 +48,88 @@ if TYPE_CHECKING:
 # ─── Custom Widgets ────────────────────────────────────────────────
 
 
+class _CheckModel(QAbstractListModel):
+    """Backing model for CheckComboBox: plain (text, checked) rows.
+
+    Replaces the old per-item QCheckBox widgets — no widget allocation,
+    style resolution, or layout per entry, and the view only renders the
+    visible rows.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows: List[list] = []  # [text, checked]
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return len(self._rows)
+
+    def flags(self, index):
+        return Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        row = self._rows[index.row()]
+        if role in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole):
+            return row[0]
+        if role == Qt.ItemDataRole.CheckStateRole:
+            return (
+                Qt.CheckState.Checked if row[1] else Qt.CheckState.Unchecked
+            )
+        return None
+
+    def set_items(self, items: List[str]):
+        self.beginResetModel()
+        self._rows = [[text, False] for text in items]
+        self.endResetModel()
+
+    def set_checked(self, items: List[str]):
+        wanted = set(items)
+        for row in self._rows:
+            row[1] = row[0] in wanted
+        if self._rows:
+            self.dataChanged.emit(
+                self.index(0),
+                self.index(len(self._rows) - 1),
+                [Qt.ItemDataRole.CheckStateRole],
+            )
+
+    def toggle(self, row: int):
+        self._rows[row][1] = not self._rows[row][1]
+        index = self.index(row)
+        self.dataChanged.emit(index, index, [Qt.ItemDataRole.CheckStateRole])
+
+    def checked_items(self) -> List[str]:
+        return [text for text, checked in self._rows if checked]
+
+
 class CheckComboBox(QComboBox):
     """ComboBox with checklist functionality for multiple selection.
-    
+
     Displays selected items as comma-separated values.
     Opens a dropdown list with checkboxes when clicked.
     """
-    
+
     def __init__(self, parent=None):
         super().__init__(parent)
-        self._selected_items: List[str] = []
-        self._all_items: List[str] = []
         self.setEditable(True)  # Make editable to set custom text
-        
-        # Create popup with list widget
-        self.list_widget = QListWidget()
-        self.list_widget.setSelectionMode(QListWidget.SelectionMode.NoSelection)
-        
-        # Connect item changed signal
-        self.list_widget.itemClicked.connect(self._on_item_clicked)
-        
-        self.setModel(self.list_widget.model())
-        self.setView(self.list_widget)
-        
+
+        # Model-backed popup: check state lives in the model, the view
+        # virtualizes rendering to visible rows
+        self._check_model = _CheckModel(self)
+        self.list_view = QListView()
+        self.list_view.setUniformItemSizes(True)
+        self.list_view.setSelectionMode(QListView.SelectionMode.NoSelection)
+
+        self.setModel(self._check_model)
+        self.setView(self.list_view)
+
+        # Toggle on any click of the row, as the old checkbox list did
+        self.list_view.clicked.connect(self._on_item_clicked)
+
         # Prevent popup from closing on item click
         self.installEventFilter(self)
-    
+
     def eventFilter(self, obj, event):
         """Prevent popup from closing when clicking items."""
-        from aqt.qt import QEvent, QMouseEvent
         if event.type() == QEvent.Type.MouseButtonPress:
             # Don't close on mouse press
             pass
@@ -72,80 +137,42 @@ class CheckComboBox(QComboBox):
             # Disable mouse wheel scrolling
             return True
         return super().eventFilter(obj, event)
-    
-    def _on_item_clicked(self, item: QListWidgetItem):
+
+    def _on_item_clicked(self, index: QModelIndex):
         """Toggle item selection when clicked."""
-        widget = self.list_widget.itemWidget(item)
-        
-        if widget and isinstance(widget, QCheckBox):
-            widget.setChecked(not widget.isChecked())
-            self._update_selected()
-            self._update_display_text()
-    
-    def _update_selected(self):
-        """Update the list of selected items."""
-        self._selected_items = []
-        for row in range(self.list_widget.count()):
-            item = self.list_widget.item(row)
-            widget = self.list_widget.itemWidget(item)
-            if widget and isinstance(widget, QCheckBox) and widget.isChecked():
-                # Get text from checkbox, not from item
-                self._selected_items.append(widget.text())
-    
+        self._check_model.toggle(index.row())
+        self._update_display_text()
+
     def _update_display_text(self):
         """Update the display text to show selected items."""
-        if self._selected_items:
-            self.setCurrentText(", ".join(self._selected_items))
+        selected = self._check_model.checked_items()
+        if selected:
+            self.setCurrentText(", ".join(selected))
         else:
             self.setCurrentText("(Select fields)")
-    
+
     def setItems(self, items: List[str]):
         """Set the list of available items."""
-        self._all_items = items
-        self._selected_items = []
-        self.clear()
-        
-        for item_text in items:
-            # Create item without text (checkbox will show the text)
-            item = QListWidgetItem()
-            checkbox = QCheckBox(item_text)
-            checkbox.setChecked(False)
-            checkbox.setStyleSheet("background: transparent; margin: 2px;")
-            
-            self.list_widget.addItem(item)
-            self.list_widget.setItemWidget(item, checkbox)
-            
-            # Adjust item height to fit checkbox
-            item.setSizeHint(checkbox.sizeHint())
-        
+        self._check_model.set_items(items)
         self._update_display_text()
-    
+
     def setCheckedItems(self, items: List[str]):
         """Set which items should be checked."""
-        for row in range(self.list_widget.count()):
-            item = self.list_widget.item(row)
-            widget = self.list_widget.itemWidget(item)
-            if widget and isinstance(widget, QCheckBox):
-                # Get text from checkbox, not from item
-                is_checked = widget.text() in items
-                widget.setChecked(is_checked)
-
-        self._update_selected()
+        self._check_model.set_checked(items)
         self._update_display_text()
-    
+
     def getCheckedItems(self) -> List[str]:
         """Get list of checked items."""
-        return self._selected_items.copy()
-    
+        return self._check_model.checked_items()
+
     def showPopup(self):
         """Override to ensure popup shows properly."""
         super().showPopup()
-        # Set focus to list widget
-        self.list_widget.setFocus()
-    
+        # Set focus to list view
+        self.list_view.setFocus()
+
     def hidePopup(self):
         """Override to update display when popup closes."""
-        self._update_selected()
         self._update_display_text()
         super().hidePopup()
 
@@ -153,32 +180,155 @@ class CheckComboBox(QComboBox):
 class SettingsDialog(QDialog):
     """Main settings dialog for LLM Field Generator."""
 
+    # UI strings on the mapping-rebuild path, built once at class scope
+    _NO_MAPPING_TEXT = (
+        'No mapping configured for this note type.\nClick "Add Mapping" to create one.'
+    )
+    _PROMPT_PLACEHOLDER = (
+        "Use {{FieldName}} to reference note fields.\n"
+        "Example: Define the word '{{Front}}' with examples."
+    )
+    _TARGET_TITLE = "Target Field %d"
+
+    # Per-mode UI behavior, replacing the if/elif chain on mode switch
+    _MODE_META = {
+        "ollama": {
+            "base_url_editable": True,
+            "url_placeholder": "http://localhost:11434",
+            "default_base_url": "http://localhost:11434",
+            "model_placeholder": "llama3.2",
+            "default_model": "llama3.2",
+        },
+        "groq": {
+            "base_url_editable": False,
+            "url_placeholder": "",
+            "default_base_url": "",
+            "model_placeholder": "llama-3.3-70b-versatile",
+            "default_model": "",
+        },
+        "gemini": {
+            "base_url_editable": False,
+            "url_placeholder": "",
+            "default_base_url": "",
+            "model_placeholder": "gemini-2.0-flash",
+            "default_model": "",
+        },
+        "openrouter": {
+            "base_url_editable": False,
+            "url_placeholder": "",
+            "default_base_url": "",
+            "model_placeholder": "anthropic/claude-3.5-sonnet",
+            "default_model": "",
+        },
+    }
+
     def __init__(self, mw: "AnkiQt", parent=None):
         super().__init__(parent or mw)
         self.mw = mw
         self._package = __name__.split(".")[0]
         self.config = self.mw.addonManager.getConfig(self._package) or {}
+        # Pristine copy: diffed on Save to skip no-op writes, restored on
+        # Cancel so in-place widget edits never outlive the dialog
+        self._original_config = copy.deepcopy(self.config)
 
         self.setWindowTitle("LLM Field Generator — Settings")
         self.setMinimumSize(600, 500)
 
         # Store settings per API mode
         self._api_settings = {}
+        self._active_api_mode: Optional[str] = None
+        self._closed = False
+
+        # models.all() walks the model manager and rebuilds a list of dicts
+        # on every call; snapshot it once per dialog open and index by name.
+        self._refresh_models_cache()
+        self._target_widgets: List[QGroupBox] = []  # one group per target field
+        self._write_timers: dict = {}  # debounce key → (QTimer, editor)
+
+        # Direct references into config for the mapping currently shown,
+        # so per-keystroke updates skip the nested dict.get chains
+        self._mapping_ref: Optional[dict] = None
+        self._targets_ref: Optional[list] = None
+        self._build_token = 0  # invalidates deferred target-group builds
+        self._showing_no_mapping = False  # "No mapping" placeholder is up
+        self._pending_mapping_note_type: Optional[str] = None
+
+        # Reuse one LLMClient (and its test result, briefly) across Test
+        # Connection clicks; rebuilt only when the connection inputs change.
+        self._client = None
+        self._client_key: Optional[tuple] = None
+        self._test_cache: dict = {}  # client key → (monotonic ts, result tuple)
+
+        self._has_shown = False  # geometry restored on first showEvent
 
         self._setup_ui()
-        self._load_config()
         self._setup_hooks()
 
-        restoreGeom(self, "llmFieldGenSettings")
+    def _refresh_models_cache(self):
+        """Snapshot the note type list and reset the field-name memo.
+
+        Called at construction and on every reopen of a recycled dialog,
+        so note types edited between opens are never stale. While the
+        dialog is up it runs modally, so nothing can change underneath.
+        """
+        self._models_cache = self.mw.col.models.all()
+        self._models_by_name = {m["name"]: m for m in self._models_cache}
+        self._fields_cache: dict = {}  # note type name → field name tuple
+
+    def prepare_reopen(self):
+        """Refresh a recycled dialog instance before showing it again.
+
+        The widget tree is expensive to build, so the instance is kept
+        on mw and reused; only data that may have changed since the last
+        open (config, note types, geometry) is reloaded here.
+        """
+        self._closed = False
+        self._setup_hooks()
+
+        self.config = self.mw.addonManager.getConfig(self._package) or {}
+        self._original_config = copy.deepcopy(self.config)
+        self._refresh_models_cache()
+        self._api_settings = {}
+        self._active_api_mode = None
+        self._mapping_ref = None
+        self._targets_ref = None
+        self._showing_no_mapping = False  # config may have changed; rebuild
+        self._test_cache.clear()
+
+        # Re-load values into whichever tabs were already built
+        if self._tab_initialized[0]:
+            self._load_connection_values()
+        if self._tab_initialized[1]:
+            self._populate_note_types()
+            note_type = self.note_type_combo.currentText()
+            if note_type:
+                self._schedule_mapping_ui(note_type)
+        if self._tab_initialized[2]:
+            self.delay_spin.setValue(
+                self.config.get("delay_between_requests_ms", 500)
+            )
 
     def _setup_hooks(self):
-        from aqt.gui_hooks import profile_will_close
-        profile_will_close.append(self.close)
+        # Register via a weak reference so the hook list never keeps a
+        # closed dialog alive (and never accumulates stale instances
+        # across repeated opens of the settings dialog).
+        close_ref = weakref.WeakMethod(self.close)
+
+        def _on_profile_will_close(ref=close_ref):
+            cb = ref()
+            if cb is not None:
+                cb()
+
+        self._profile_close_cb = _on_profile_will_close
+        profile_will_close.append(self._profile_close_cb)
 
     def _teardown_hooks(self):
-        from aqt.gui_hooks import profile_will_close
+        cb = self._profile_close_cb
+        if cb is None:
+            return
+        self._profile_close_cb = None
         try:
-            profile_will_close.remove(self.close)
+            profile_will_close.remove(cb)
         except ValueError:
             pass
 
@@ -186,18 +336,24 @@ class SettingsDialog(QDialog):
         layout = QVBoxLayout()
         self.setLayout(layout)
 
-        # Tabs
+        # Tabs are built lazily: placeholders get real content the first
+        # time they are shown, so opening the dialog only pays for the
+        # Connection tab instead of constructing every mapping widget
+        # (and scanning note types) up front.
         self.tabs = QTabWidget()
         layout.addWidget(self.tabs)
 
-        # Tab 1: Connection
-        self._setup_connection_tab()
-
-        # Tab 2: Note Type Mappings
-        self._setup_mappings_tab()
-
-        # Tab 3: Behavior
-        self._setup_behavior_tab()
+        self.tabs.addTab(QWidget(), "Connection")
+        self.tabs.addTab(QWidget(), "Field Mappings")
+        self.tabs.addTab(QWidget(), "Behavior")
+        self._tab_initialized = [False, False, False]
+        self._tab_builders = [
+            self._setup_connection_tab,
+            self._setup_mappings_tab,
+            self._setup_behavior_tab,
+        ]
+        self.tabs.currentChanged.connect(self._ensure_tab)
+        self._ensure_tab(0)
 
         # Bottom buttons
         btn_layout = QHBoxLayout()
@@ -218,10 +374,17 @@ class SettingsDialog(QDialog):
 
         layout.addLayout(btn_layout)
 
+    @pyqtSlot(int)
+    def _ensure_tab(self, idx: int):
+        """Build a tab's real content the first time it is shown."""
+        if idx < 0 or self._tab_initialized[idx]:
+            return
+        self._tab_initialized[idx] = True
+        self._tab_builders[idx](self.tabs.widget(idx))
+
     # ─── Tab 1: Connection ─────────────────────────────────────────
 
-    def _setup_connection_tab(self):
-        tab = QWidget()
+    def _setup_connection_tab(self, tab: QWidget):
         layout = QVBoxLayout()
         tab.setLayout(layout)
 
@@ -284,12 +447,11 @@ class SettingsDialog(QDialog):
         layout.addWidget(gen_group)
         layout.addStretch()
 
-        self.tabs.addTab(tab, "Connection")
+        self._load_connection_values()
 
     # ─── Tab 2: Mappings ───────────────────────────────────────────
 
-    def _setup_mappings_tab(self):
-        tab = QWidget()
+    def _setup_mappings_tab(self, tab: QWidget):
         layout = QVBoxLayout()
         tab.setLayout(layout)
 
@@ -302,7 +464,11 @@ class SettingsDialog(QDialog):
             QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Fixed
         )
         self._populate_note_types()
-        self.note_type_combo.currentTextChanged.connect(self._on_note_type_changed)
+        # Queued: the mapping rebuild runs from the event loop rather
+        # than re-entrantly inside the combo's signal emission
+        self.note_type_combo.currentTextChanged.connect(
+            self._on_note_type_changed, Qt.ConnectionType.QueuedConnection
+        )
         top_layout.addWidget(self.note_type_combo)
 
         self.add_mapping_btn = QPushButton("Add Mapping")
@@ -320,24 +486,34 @@ class SettingsDialog(QDialog):
         scroll.setWidget(self.mapping_container)
         layout.addWidget(scroll)
 
-        self.tabs.addTab(tab, "Field Mappings")
+        # Load the mapping for the initially selected note type
+        note_type = self.note_type_combo.currentText()
+        if note_type:
+            self._schedule_mapping_ui(note_type)
 
     def _populate_note_types(self):
+        # One batched insert, no per-item signal emissions or relayout
+        names = [m["name"] for m in self._models_cache]
+        self.note_type_combo.blockSignals(True)
         self.note_type_combo.clear()
-        models = self.mw.col.models.all()
-        for model in models:
-            self.note_type_combo.addItem(model["name"])
-
-    def _get_fields_for_note_type(self, note_type_name: str) -> list:
-        models = self.mw.col.models.all()
-        for model in models:
-            if model["name"] == note_type_name:
-                return [f["name"] for f in model["flds"]]
-        return []
-
+        self.note_type_combo.addItems(names)
+        self.note_type_combo.blockSignals(False)
+
+    def _get_fields_for_note_type(self, note_type_name: str) -> tuple:
+        # Immutable so every combo built for this note type shares the
+        # exact same object instead of defensive copies
+        fields = self._fields_cache.get(note_type_name)
+        if fields is None:
+            model = self._models_by_name.get(note_type_name, {})
+            fields = tuple(f["name"] for f in model.get("flds", []))
+            self._fields_cache[note_type_name] = fields
+        return fields
+
+    @pyqtSlot(str)
     def _on_note_type_changed(self, note_type_name: str):
-        self._load_mapping_ui(note_type_name)
+        self._schedule_mapping_ui(note_type_name)
 
+    @pyqtSlot()
     def _add_mapping_for_current_type(self):
         note_type_name = self.note_type_combo.currentText()
         if not note_type_name:
@@ -367,25 +543,73 @@ class SettingsDialog(QDialog):
         }
         self._load_mapping_ui(note_type_name)
 
+    def _schedule_mapping_ui(self, note_type_name: str):
+        """Coalesce mapping rebuild requests into one build per event loop turn.
+
+        On tab setup the initial build and the combo's change signal can
+        both ask for a rebuild; only the last requested note type is built.
+        """
+        if self._pending_mapping_note_type is None:
+            QTimer.singleShot(0, self._flush_mapping_ui)
+        self._pending_mapping_note_type = note_type_name
+
+    def _flush_mapping_ui(self):
+        note_type_name = self._pending_mapping_note_type
+        self._pending_mapping_note_type = None
+        if note_type_name is not None:
+            self._load_mapping_ui(note_type_name)
+
+    # Target groups built synchronously; roughly what fits the viewport
+    INITIAL_TARGET_BUILD = 4
+
     def _load_mapping_ui(self, note_type_name: str):
-        # Clear existing UI
+        # Full rebuild — only reached on note type change or when a
+        # mapping is created/deleted. Value edits update config in place
+        # and add/remove of a target field only touches its own group,
+        # so N group boxes are not torn down per checkbox toggle.
+
+        # Switching between note types that both lack a mapping would
+        # rebuild the same placeholder label; nothing to do.
+        if (
+            self._showing_no_mapping
+            and note_type_name not in self.config.get("note_type_mappings", {})
+        ):
+            return
+
+        self._flush_pending_writes()
+        self._discard_write_timers()
+
+        # One repaint for the whole teardown + rebuild
+        self.mapping_container.setUpdatesEnabled(False)
+        try:
+            self._load_mapping_ui_inner(note_type_name)
+        finally:
+            self.mapping_container.setUpdatesEnabled(True)
+
+    def _load_mapping_ui_inner(self, note_type_name: str):
         while self.mapping_layout.count():
             item = self.mapping_layout.takeAt(0)
             widget = item.widget()
             if widget:
                 widget.deleteLater()
+        self._target_widgets = []
 
         mappings = self.config.get("note_type_mappings", {})
-        if note_type_name not in mappings:
-            label = QLabel(
-                'No mapping configured for this note type.\nClick "Add Mapping" to create one.'
-            )
+        self._showing_no_mapping = note_type_name not in mappings
+        if self._showing_no_mapping:
+            self._mapping_ref = None
+            self._targets_ref = None
+            label = QLabel(self._NO_MAPPING_TEXT)
             label.setAlignment(Qt.AlignmentFlag.AlignCenter)
             self.mapping_layout.addWidget(label)
             self.mapping_layout.addStretch()
             return
 
         mapping = mappings[note_type_name]
+        targets = mapping.setdefault("target_fields", [])
+        # Keep direct references for the update handlers
+        self._mapping_ref = mapping
+        self._targets_ref = targets
         fields = self._get_fields_for_note_type(note_type_name)
 
         # Mapping config group
@@ -395,20 +619,24 @@ class SettingsDialog(QDialog):
 
         # Source fields (multiple selection with CheckComboBox)
         source_combo = CheckComboBox()
-        source_combo.setItems(fields)
-        
+
         # Support both old (source_field) and new (source_fields) format
         current_source = mapping.get("source_field", "")
         current_sources = mapping.get("source_fields", [])
-        
+
         # Convert old format to new format for backward compatibility
         if current_source and not current_sources:
             current_sources = [current_source]
-        
+
+        # Populate silently — setItems/setCheckedItems update the display
+        # text, which would otherwise fire currentTextChanged per call
+        source_combo.blockSignals(True)
+        source_combo.setItems(fields)
         source_combo.setCheckedItems(current_sources)
+        source_combo.blockSignals(False)
         source_combo.setToolTip("Select one or more source fields. Hold Ctrl to select multiple.")
         source_combo.currentTextChanged.connect(
-            lambda: self._update_source_fields(note_type_name, source_combo.getCheckedItems())
+            functools.partial(self._on_source_fields_changed, note_type_name, source_combo)
         )
         form.addRow("Source Fields (input):", source_combo)
 
@@ -417,8 +645,10 @@ class SettingsDialog(QDialog):
         system_prompt_edit.setMaximumHeight(80)
         system_prompt_edit.setPlainText(mapping.get("system_prompt", ""))
         system_prompt_edit.textChanged.connect(
-            lambda: self._update_mapping_value(
-                note_type_name, "system_prompt", system_prompt_edit.toPlainText()
+            functools.partial(
+                self._schedule_write,
+                ("mapping", note_type_name, "system_prompt"),
+                system_prompt_edit,
             )
         )
         form.addRow("System Prompt:", system_prompt_edit)
@@ -443,7 +673,7 @@ class SettingsDialog(QDialog):
             cb = QCheckBox(trigger_label)
             cb.setChecked(trigger_id in current_triggers)
             cb.toggled.connect(
-                lambda checked, tid=trigger_id: self._update_triggers(note_type_name, tid, checked)
+                functools.partial(self._update_triggers, note_type_name, trigger_id)
             )
             trigger_layout.addWidget(cb)
             self._trigger_checkboxes[trigger_id] = cb
@@ -452,97 +682,211 @@ class SettingsDialog(QDialog):
 
         self.mapping_layout.addWidget(group)
 
-        # Target fields
-        target_fields = mapping.get("target_fields", [])
-        for idx, target in enumerate(target_fields):
-            tgroup = QGroupBox(f"Target Field {idx + 1}")
-            tform = QFormLayout()
-            tgroup.setLayout(tform)
-
-            # Target field selector
-            target_combo = QComboBox()
-            target_combo.addItems(fields)
-            tf_name = target.get("field_name", "")
-            if tf_name in fields:
-                target_combo.setCurrentText(tf_name)
-            target_combo.currentTextChanged.connect(
-                lambda text, i=idx: self._update_target_field(
-                    note_type_name, i, "field_name", text
-                )
-            )
-            tform.addRow("Field:", target_combo)
-
-            # Prompt template
-            prompt_edit = QPlainTextEdit()
-            prompt_edit.setMaximumHeight(120)
-            prompt_edit.setPlainText(target.get("prompt_template", ""))
-            prompt_edit.setPlaceholderText(
-                "Use {{FieldName}} to reference note fields.\n"
-                "Example: Define the word '{{Front}}' with examples."
-            )
-            prompt_edit.textChanged.connect(
-                lambda te=prompt_edit, i=idx: self._update_target_field(
-                    note_type_name, i, "prompt_template", te.toPlainText()
-                )
-            )
-            tform.addRow("Prompt Template:", prompt_edit)
-
-            # Overwrite checkbox
-            overwrite_cb = QCheckBox("Overwrite existing content")
-            overwrite_cb.setChecked(target.get("overwrite", False))
-            overwrite_cb.toggled.connect(
-                lambda checked, i=idx: self._update_target_field(
-                    note_type_name, i, "overwrite", checked
-                )
-            )
-            tform.addRow("", overwrite_cb)
-
-            # Remove button
-            remove_btn = QPushButton("Remove Target Field")
-            remove_btn.clicked.connect(
-                lambda _, i=idx: self._remove_target_field(note_type_name, i)
-            )
-            tform.addRow("", remove_btn)
-
+        # Target fields: build the rows that fit the viewport now and
+        # defer the rest to the next event-loop turn, so a mapping with
+        # many targets paints immediately instead of paying for every
+        # QPlainTextEdit (document, layout, undo stack) before first show
+        self._build_token += 1
+        for idx, target in enumerate(targets[: self.INITIAL_TARGET_BUILD]):
+            tgroup = self._build_target_group(note_type_name, idx, target, fields)
+            self._target_widgets.append(tgroup)
             self.mapping_layout.addWidget(tgroup)
 
         # Add target field button
-        add_target_btn = QPushButton("+ Add Target Field")
-        add_target_btn.clicked.connect(
-            lambda: self._add_target_field(note_type_name)
+        self.add_target_btn = QPushButton("+ Add Target Field")
+        self.add_target_btn.clicked.connect(
+            functools.partial(self._on_add_target_clicked, note_type_name)
         )
-        self.mapping_layout.addWidget(add_target_btn)
+        self.mapping_layout.addWidget(self.add_target_btn)
 
         # Delete mapping button
         delete_btn = QPushButton("Delete Entire Mapping")
         delete_btn.setStyleSheet("color: red;")
         delete_btn.clicked.connect(
-            lambda: self._delete_mapping(note_type_name)
+            functools.partial(self._on_delete_mapping_clicked, note_type_name)
         )
         self.mapping_layout.addWidget(delete_btn)
 
         self.mapping_layout.addStretch()
 
+        if len(targets) > self.INITIAL_TARGET_BUILD:
+            QTimer.singleShot(
+                0,
+                functools.partial(
+                    self._build_remaining_targets, note_type_name, self._build_token
+                ),
+            )
+
+    def _build_remaining_targets(self, note_type_name: str, token: int):
+        """Build the target groups deferred past the initial paint."""
+        if token != self._build_token or self._targets_ref is None:
+            return  # the mapping UI was rebuilt since this was scheduled
+        targets = self._targets_ref
+        fields = self._get_fields_for_note_type(note_type_name)
+        insert_at = self.mapping_layout.indexOf(self.add_target_btn)
+        for idx in range(len(self._target_widgets), len(targets)):
+            tgroup = self._build_target_group(note_type_name, idx, targets[idx], fields)
+            self._target_widgets.append(tgroup)
+            self.mapping_layout.insertWidget(insert_at, tgroup)
+            insert_at += 1
+
+    def _build_target_group(
+        self, note_type_name: str, idx: int, target: dict, fields: tuple
+    ) -> QGroupBox:
+        """Build the group box for one target field.
+
+        Slots look up the group's current position in _target_widgets at
+        call time, so removing an earlier target never requires
+        reconnecting the groups after it.
+        """
+        tgroup = QGroupBox(self._TARGET_TITLE % (idx + 1))
+        tform = QFormLayout()
+        tgroup.setLayout(tform)
+
+        # Target field selector
+        target_combo = QComboBox()
+        target_combo.blockSignals(True)
+        target_combo.addItems(fields)
+        tf_name = target.get("field_name", "")
+        if tf_name in fields:
+            target_combo.setCurrentText(tf_name)
+        target_combo.blockSignals(False)
+        target_combo.currentTextChanged.connect(
+            functools.partial(self._on_target_name_changed, note_type_name, tgroup)
+        )
+        tform.addRow("Field:", target_combo)
+
+        # Prompt template
+        prompt_edit = QPlainTextEdit()
+        prompt_edit.setMaximumHeight(120)
+        prompt_edit.setPlainText(target.get("prompt_template", ""))
+        prompt_edit.setPlaceholderText(self._PROMPT_PLACEHOLDER)
+        prompt_edit.textChanged.connect(
+            functools.partial(
+                self._schedule_write,
+                ("target", note_type_name, tgroup, "prompt_template"),
+                prompt_edit,
+            )
+        )
+        tform.addRow("Prompt Template:", prompt_edit)
+
+        # Overwrite checkbox
+        overwrite_cb = QCheckBox("Overwrite existing content")
+        overwrite_cb.setChecked(target.get("overwrite", False))
+        overwrite_cb.toggled.connect(
+            functools.partial(self._on_target_overwrite_toggled, note_type_name, tgroup)
+        )
+        tform.addRow("", overwrite_cb)
+
+        # Remove button
+        remove_btn = QPushButton("Remove Target Field")
+        remove_btn.clicked.connect(
+            functools.partial(self._on_remove_target_clicked, note_type_name, tgroup)
+        )
+        tform.addRow("", remove_btn)
+
+        return tgroup
+
+    def _target_index(self, group: QGroupBox) -> int:
+        """Current position of a target group, tracking removals."""
+        return self._target_widgets.index(group)
+
+    # Signal trampolines — bound once with functools.partial instead of
+    # allocating a fresh lambda per widget on every rebuild. The Qt
+    # signal argument always arrives last.
+
+    def _on_source_fields_changed(self, note_type_name: str, combo, _text: str):
+        self._update_source_fields(note_type_name, combo.getCheckedItems())
+
+    def _on_target_name_changed(self, note_type_name: str, group, text: str):
+        self._update_target_field(
+            note_type_name, self._target_index(group), "field_name", text
+        )
+
+    def _on_target_overwrite_toggled(self, note_type_name: str, group, checked: bool):
+        self._update_target_field(
+            note_type_name, self._target_index(group), "overwrite", checked
+        )
+
+    def _on_remove_target_clicked(self, note_type_name: str, group, _checked: bool = False):
+        self._remove_target_field(note_type_name, self._target_index(group))
+
+    def _on_add_target_clicked(self, note_type_name: str, _checked: bool = False):
+        self._add_target_field(note_type_name)
+
+    def _on_delete_mapping_clicked(self, note_type_name: str, _checked: bool = False):
+        self._delete_mapping(note_type_name)
+
+    # ─── Debounced prompt writes ──────────────────────────────────
+    #
+    # textChanged fires per keystroke; serializing the whole
+    # QTextDocument and writing it into config that often is wasted
+    # work. Coalesce into one write once typing pauses.
+
+    WRITE_DEBOUNCE_MS = 250
+
+    def _schedule_write(self, key: tuple, editor):
+        """(Re)start the debounce timer for one editor."""
+        entry = self._write_timers.get(key)
+        if entry is None:
+            timer = QTimer(self)
+            timer.setSingleShot(True)
+            timer.timeout.connect(functools.partial(self._flush_write, key, editor))
+            self._write_timers[key] = (timer, editor)
+        else:
+            timer = entry[0]
+        timer.start(self.WRITE_DEBOUNCE_MS)
+
+    def _flush_write(self, key: tuple, editor):
+        """Read the editor once and store its text into config."""
+        kind, note_type_name = key[0], key[1]
+        if kind == "mapping":
+            self._update_mapping_value(note_type_name, key[2], editor.toPlainText())
+        else:  # "target"
+            group = key[2]
+            if group not in self._target_widgets:
+                return  # target was removed before the timer fired
+            self._update_target_field(
+                note_type_name, self._target_index(group), key[3],
+                editor.toPlainText()
+            )
+
+    def _flush_pending_writes(self):
+        """Apply any debounced edits immediately (before save/rebuild)."""
+        for key, (timer, editor) in list(self._write_timers.items()):
+            if timer.isActive():
+                timer.stop()
+                self._flush_write(key, editor)
+
+    def _discard_write_timers(self):
+        """Drop timers whose editors are about to be destroyed."""
+        for timer, _editor in self._write_timers.values():
+            timer.stop()
+            timer.deleteLater()
+        self._write_timers = {}
+
+    # The update handlers below only ever fire for the mapping that is
+    # currently displayed, so they go through _mapping_ref/_targets_ref
+    # instead of re-walking config.get chains on every keystroke.
+
     def _update_mapping_value(self, note_type_name: str, key: str, value):
-        mappings = self.config.setdefault("note_type_mappings", {})
-        if note_type_name in mappings:
-            mappings[note_type_name][key] = value
+        if self._mapping_ref is not None:
+            self._mapping_ref[key] = value
 
     def _update_source_fields(self, note_type_name: str, fields: List[str]):
         """Update source_fields array in mapping config."""
-        mappings = self.config.setdefault("note_type_mappings", {})
-        if note_type_name in mappings:
+        mapping = self._mapping_ref
+        if mapping is not None:
             # Store as array (new format)
-            mappings[note_type_name]["source_fields"] = fields
+            mapping["source_fields"] = fields
             # Remove old format key if exists
-            if "source_field" in mappings[note_type_name]:
-                del mappings[note_type_name]["source_field"]
+            if "source_field" in mapping:
+                del mapping["source_field"]
 
     def _update_triggers(self, note_type_name: str, trigger_id: str, enabled: bool):
-        mappings = self.config.get("note_type_mappings", {})
-        if note_type_name not in mappings:
+        if self._mapping_ref is None:
             return
-        triggers = mappings[note_type_name].setdefault(
+        triggers = self._mapping_ref.setdefault(
             "triggered_by", ["mining", "add_cards", "browse", "focus_lost", "toolbar"]
         )
         if enabled and trigger_id not in triggers:
@@ -551,34 +895,42 @@ class SettingsDialog(QDialog):
             triggers.remove(trigger_id)
 
     def _update_target_field(self, note_type_name: str, idx: int, key: str, value):
-        mappings = self.config.get("note_type_mappings", {})
-        if note_type_name in mappings:
-            targets = mappings[note_type_name].get("target_fields", [])
-            if idx < len(targets):
-                targets[idx][key] = value
+        targets = self._targets_ref
+        if targets is not None and idx < len(targets):
+            targets[idx][key] = value
 
     def _add_target_field(self, note_type_name: str):
-        mappings = self.config.get("note_type_mappings", {})
-        if note_type_name not in mappings:
+        targets = self._targets_ref
+        if targets is None:
             return
 
         fields = self._get_fields_for_note_type(note_type_name)
-        mappings[note_type_name].setdefault("target_fields", []).append(
-            {
-                "field_name": fields[0] if fields else "",
-                "prompt_template": "",
-                "overwrite": False,
-            }
+        target = {
+            "field_name": fields[0] if fields else "",
+            "prompt_template": "",
+            "overwrite": False,
+        }
+        targets.append(target)
+
+        # Insert just the new group before the "+ Add Target Field" button
+        tgroup = self._build_target_group(
+            note_type_name, len(targets) - 1, target, fields
+        )
+        self._target_widgets.append(tgroup)
+        self.mapping_layout.insertWidget(
+            self.mapping_layout.indexOf(self.add_target_btn), tgroup
         )
-        self._load_mapping_ui(note_type_name)
 
     def _remove_target_field(self, note_type_name: str, idx: int):
-        mappings = self.config.get("note_type_mappings", {})
-        if note_type_name in mappings:
-            targets = mappings[note_type_name].get("target_fields", [])
-            if idx < len(targets):
-                targets.pop(idx)
-                self._load_mapping_ui(note_type_name)
+        targets = self._targets_ref
+        if targets is not None and idx < len(targets):
+            targets.pop(idx)
+            tgroup = self._target_widgets.pop(idx)
+            tgroup.setParent(None)
+            tgroup.deleteLater()
+            # Renumber the remaining group titles
+            for i, g in enumerate(self._target_widgets):
+                g.setTitle(self._TARGET_TITLE % (i + 1))
 
     def _delete_mapping(self, note_type_name: str):
         reply = QMessageBox.question(
@@ -593,8 +945,7 @@ class SettingsDialog(QDialog):
 
     # ─── Tab 3: Behavior ──────────────────────────────────────────
 
-    def _setup_behavior_tab(self):
-        tab = QWidget()
+    def _setup_behavior_tab(self, tab: QWidget):
         layout = QVBoxLayout()
         tab.setLayout(layout)
 
@@ -618,123 +969,147 @@ class SettingsDialog(QDialog):
         info_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         layout.addWidget(info_label)
 
-        layout.addStretch()
+        self.delay_spin.setValue(self.config.get("delay_between_requests_ms", 500))
 
-        self.tabs.addTab(tab, "Behavior")
+        layout.addStretch()
 
     # ─── Load / Save ──────────────────────────────────────────────
 
-    def _load_config(self):
+    def _load_connection_values(self):
         c = self.config
         api_mode = c.get("api_mode", "ollama")
-        
-        # Initialize API settings storage with current config
+
+        # Hydrate per-mode settings persisted in config, so switching
+        # modes shows what was last entered for that mode rather than
+        # empty defaults. The legacy top-level keys seed the active mode.
+        self._api_settings = {
+            mode: dict(vals)
+            for mode, vals in c.get("api_settings_by_mode", {}).items()
+            if isinstance(vals, dict)
+        }
         self._api_settings[api_mode] = {
             "base_url": c.get("api_base_url", "http://localhost:11434"),
             "api_key": c.get("api_key", ""),
             "model": c.get("model", "llama3.2"),
         }
-        
+        self._active_api_mode = None
+
         self.api_mode_combo.setCurrentText(api_mode)
-        self.base_url_edit.setText(c.get("api_base_url", "http://localhost:11434"))
-        self.api_key_edit.setText(c.get("api_key", ""))
-        self.model_edit.setText(c.get("model", "llama3.2"))
         self.temperature_spin.setValue(c.get("temperature", 0.7))
         self.max_tokens_spin.setValue(c.get("max_tokens", 500))
         self.timeout_spin.setValue(c.get("timeout", 60))
-        self.delay_spin.setValue(c.get("delay_between_requests_ms", 500))
 
         # Trigger UI update based on API mode
         self._on_api_mode_changed(api_mode)
 
-        # Load first note type mapping if available
-        note_type = self.note_type_combo.currentText()
-        if note_type:
-            self._load_mapping_ui(note_type)
-
+    @pyqtSlot()
     def _save_config(self):
         """Save config and close dialog. Called by Save button."""
-        self._save_all_settings()
         self.accept()
 
     # ─── Actions ──────────────────────────────────────────────────
 
+    @pyqtSlot(str)
     def _on_api_mode_changed(self, api_mode: str):
         """Update UI based on selected API mode and save/load settings."""
-        # Save current settings before switching
-        current_mode = self.api_mode_combo.currentText()
-        if current_mode and hasattr(self, '_api_settings'):
+        # Stash the widgets under the mode being left, keyed by the
+        # previously active mode (the combo already shows the new one)
+        if self._active_api_mode and self._active_api_mode != api_mode:
             self._save_current_api_settings()
-        
+        self._active_api_mode = api_mode
+
         # Update group title
         self.api_group.setTitle(f"{api_mode.capitalize()} Connection")
-        
-        # Load saved settings for this API mode, or use defaults
+
+        # Table-driven: placeholders and editability per mode
+        meta = self._MODE_META.get(api_mode, self._MODE_META["ollama"])
         saved = self._api_settings.get(api_mode, {})
-        
-        if api_mode == "ollama":
-            self.base_url_edit.setEnabled(True)
-            self.base_url_edit.setText(saved.get("base_url", "http://localhost:11434"))
-            self.base_url_edit.setPlaceholderText("http://localhost:11434")
-            self.model_edit.setText(saved.get("model", "llama3.2"))
-            self.model_edit.setPlaceholderText("llama3.2")
-            self.api_key_edit.setText(saved.get("api_key", ""))
-        else:
-            self.base_url_edit.setEnabled(False)
-            self.base_url_edit.clear()
-            self.api_key_edit.setText(saved.get("api_key", ""))
-            self.model_edit.setText(saved.get("model", ""))
-            if api_mode == "groq":
-                self.model_edit.setPlaceholderText("llama-3.3-70b-versatile")
-            elif api_mode == "gemini":
-                self.model_edit.setPlaceholderText("gemini-2.0-flash")
-            elif api_mode == "openrouter":
-                self.model_edit.setPlaceholderText("anthropic/claude-3.5-sonnet")
-    
+
+        self.base_url_edit.setEnabled(meta["base_url_editable"])
+        self.base_url_edit.setPlaceholderText(meta["url_placeholder"])
+        self.base_url_edit.setText(saved.get("base_url", meta["default_base_url"]))
+        self.api_key_edit.setText(saved.get("api_key", ""))
+        self.model_edit.setText(saved.get("model", meta["default_model"]))
+        self.model_edit.setPlaceholderText(meta["model_placeholder"])
+
     def _save_current_api_settings(self):
-        """Save current API settings to memory."""
-        current_mode = self.api_mode_combo.currentText()
-        if not current_mode:
+        """Stash the connection widgets under the active API mode."""
+        mode = self._active_api_mode
+        if not mode:
             return
-        
-        self._api_settings[current_mode] = {
+
+        self._api_settings[mode] = {
             "base_url": self.base_url_edit.text().strip(),
             "api_key": self.api_key_edit.text().strip(),
             "model": self.model_edit.text().strip(),
         }
 
-    def _test_connection(self):
-        from ..llm_client import LLMClient
+    TEST_CACHE_TTL = 30.0  # seconds
 
+    @pyqtSlot()
+    def _test_connection(self):
         api_mode = self.api_mode_combo.currentText()
         base_url = self.base_url_edit.text().strip()
-        
+
         # Set default base URL for Ollama
         if api_mode == "ollama":
             base_url = base_url or "http://localhost:11434"
-        
-        client = LLMClient(
-            base_url=base_url,
-            api_key=self.api_key_edit.text().strip(),
-            api_mode=api_mode,
-            model=self.model_edit.text().strip() or "llama3.2",
+
+        key = (
+            api_mode,
+            base_url,
+            self.api_key_edit.text().strip(),
+            self.model_edit.text().strip() or "llama3.2",
         )
-        
+
+        # Re-clicking Test without changing anything reuses the recent
+        # result instead of re-issuing the HTTP round-trip.
+        cached = self._test_cache.get(key)
+        if cached is not None and time.monotonic() - cached[0] < self.TEST_CACHE_TTL:
+            success, message = cached[1]
+            if success:
+                showInfo(f"✓ Connection Successful!\n\n{message}", parent=self)
+            else:
+                showInfo(f"✗ Connection Failed\n\n{message}", parent=self)
+            return
+
+        if self._client is None or self._client_key != key:
+            if self._client is not None:
+                self._client.close()
+            self._client = LLMClient(
+                base_url=key[1],
+                api_key=key[2],
+                api_mode=key[0],
+                model=key[3],
+            )
+            self._client_key = key
+        client = self._client
+
         self.test_btn.setEnabled(False)
         self.test_btn.setText("Testing...")
-        
-        # Run test in background to avoid UI freeze
-        from aqt.operations import QueryOp
-        from aqt import mw
-        
-        def do_test(_col) -> tuple:
+
+        # Run the HTTP round-trip on Anki's worker pool; taskman routes
+        # completion back to the main thread, keeping the dialog
+        # responsive for the full timeout without QueryOp's progress
+        # window or collection plumbing.
+        def do_test() -> tuple:
             return client.test_connection()
-        
-        def on_done(result: tuple):
+
+        def on_done(future):
             self.test_btn.setEnabled(True)
             self.test_btn.setText("Test Connection")
-            
-            success, message = result
+
+            try:
+                success, message = future.result()
+            except Exception as exc:
+                showInfo(
+                    f"✗ Test Error\n\n{str(exc)}",
+                    parent=self,
+                )
+                return
+
+            self._test_cache[key] = (time.monotonic(), (success, message))
+
             if success:
                 showInfo(
                     f"✓ Connection Successful!\n\n{message}",
@@ -745,57 +1120,115 @@ class SettingsDialog(QDialog):
                     f"✗ Connection Failed\n\n{message}",
                     parent=self,
                 )
-        
-        def on_error(exc: Exception):
-            self.test_btn.setEnabled(True)
-            self.test_btn.setText("Test Connection")
-            showInfo(
-                f"✗ Test Error\n\n{str(exc)}",
-                parent=self,
-            )
-        
-        QueryOp(
-            parent=self,
-            op=do_test,
-            success=on_done,
-        ).failure(on_error).without_collection().run_in_background()
+
+        self.mw.taskman.run_in_background(do_test, on_done)
 
     # ─── Lifecycle ────────────────────────────────────────────────
 
+    def showEvent(self, event):
+        """Restore saved geometry once the window is actually shown.
+
+        Restoring while hidden makes Qt guess frame metrics and repaint
+        on show; a recycled instance keeps its geometry between opens.
+        """
+        super().showEvent(event)
+        if not self._has_shown:
+            self._has_shown = True
+            restoreGeom(self, "llmFieldGenSettings")
+
     def _on_close(self):
-        """Cleanup hooks and save window geometry."""
-        saveGeom(self, "llmFieldGenSettings")
+        """Cleanup hooks and save window geometry (exactly once)."""
+        if self._closed:
+            return
+        self._closed = True
+        # Never persist the default geometry of a dialog that was
+        # closed without being shown
+        if self._has_shown:
+            saveGeom(self, "llmFieldGenSettings")
         self._teardown_hooks()
 
+        # The instance stays alive for recycling; drop what reopen
+        # rebuilds anyway so a hidden dialog holds no collection data,
+        # test client, or stale config references
+        self._models_cache = []
+        self._models_by_name = {}
+        self._fields_cache = {}
+        if self._client is not None:
+            self._client.close()
+        self._client = None
+        self._client_key = None
+        self._test_cache.clear()
+        self._mapping_ref = None
+        self._targets_ref = None
+        self._discard_write_timers()
+
     def _save_all_settings(self):
-        """Save all settings to config file. Only called on explicit Save."""
-        # Save current API settings
-        self._save_current_api_settings()
-        
-        # Get the currently selected API mode's settings
-        api_mode = self.api_mode_combo.currentText()
-        saved = self._api_settings.get(api_mode, {})
-        
-        self.config["api_base_url"] = saved.get("base_url", "")
-        self.config["api_key"] = saved.get("api_key", "")
-        self.config["model"] = saved.get("model", "")
-        self.config["api_mode"] = api_mode
-        self.config["temperature"] = self.temperature_spin.value()
-        self.config["max_tokens"] = self.max_tokens_spin.value()
-        self.config["timeout"] = self.timeout_spin.value()
-        self.config["delay_between_requests_ms"] = self.delay_spin.value()
-        
+        """Save all settings to config file. Only called on explicit Save.
+
+        Tabs that were never shown have no widgets to read back; their
+        config keys keep the values loaded at dialog open. Returns True
+        when a write actually happened.
+        """
+        self._flush_pending_writes()
+
+        if self._tab_initialized[0]:
+            # Save current API settings
+            self._save_current_api_settings()
+
+            # Get the currently selected API mode's settings
+            api_mode = self.api_mode_combo.currentText()
+            saved = self._api_settings.get(api_mode, {})
+
+            self.config["api_base_url"] = saved.get("base_url", "")
+            self.config["api_key"] = saved.get("api_key", "")
+            self.config["model"] = saved.get("model", "")
+            self.config["api_mode"] = api_mode
+            self.config["temperature"] = self.temperature_spin.value()
+            self.config["max_tokens"] = self.max_tokens_spin.value()
+            self.config["timeout"] = self.timeout_spin.value()
+            # Persist every mode's settings so switching modes across
+            # sessions never loses what was entered
+            self.config["api_settings_by_mode"] = self._api_settings
+
+        if self._tab_initialized[2]:
+            self.config["delay_between_requests_ms"] = self.delay_spin.value()
+
+        # Skip the disk write (and cache invalidation) when nothing
+        # actually changed since the dialog was opened
+        if self.config == self._original_config:
+            return False
+
         # Write to config file
         self.mw.addonManager.writeConfig(self._package, self.config)
+        self._original_config = copy.deepcopy(self.config)
+
+        # Cached config and mapping resolutions are now stale
+        from ..card_processor import invalidate_config
+        invalidate_config()
+
+        # Warm the template cache so the first generation after a save
+        # doesn't pay the parse (compile_template memoizes per template)
+        for mapping in self.config.get("note_type_mappings", {}).values():
+            for target in mapping.get("target_fields", []):
+                template = target.get("prompt_template", "")
+                if template:
+                    compile_template(template)
+        return True
 
     def reject(self):
         """Called when user clicks Cancel. Don't save config."""
+        # Restore the pristine state in place so anything still holding
+        # this dict (mapping refs, trampolines) sees unedited values
+        self.config.clear()
+        self.config.update(self._original_config)
         self._on_close()
         super().reject()
 
     def accept(self):
         """Called when user clicks Save. Save config and close."""
-        self._save_all_settings()
-        tooltip("Settings saved!", parent=self)
+        if self._save_all_settings():
+            tooltip("Settings saved!", parent=self)
+        else:
+            tooltip("No changes to save", parent=self)
         self._on_close()
         super().accept()
@@ -0,0 +1,352 @@
+# Anki LLM Field Generator
+# On-disk response caches
+#
+# Exact-match cache: identical prompts recur across bulk fills, retries, and
+# duplicated notes. Caching responses turns those repeat LLM round-trips into
+# a local sqlite lookup. Keyed by SHA-256 of (model, system_prompt, prompt,
+# temperature).
+#
+# Semantic cache (optional): decks contain many near-duplicate sentences
+# (same vocab, minor punctuation) that the exact-match cache misses. When
+# enabled, prompts are embedded via Ollama's /api/embeddings and a previous
+# response is reused when cosine similarity meets the configured threshold.
+
+import hashlib
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+import urllib.error
+import urllib.request
+from typing import List, Optional
+
+try:
+    import numpy as np  # optional: faster similarity search when available
+except ImportError:
+    np = None
+
+DB_FILENAME = "llm_cache.db"
+DEFAULT_MAX_ENTRIES = 10000
+
+# Single shared connection, guarded by a lock so bulk worker threads and the
+# main thread can share it. WAL mode keeps concurrent reads cheap.
+_conn: Optional[sqlite3.Connection] = None
+_lock = threading.Lock()
+
+
+def _db_path() -> str:
+    """Path to the cache DB inside the addon's user_files folder.
+
+    user_files is preserved by Anki across addon updates.
+    """
+    addon_dir = os.path.dirname(os.path.abspath(__file__))
+    user_files = os.path.join(addon_dir, "user_files")
+    os.makedirs(user_files, exist_ok=True)
+    return os.path.join(user_files, DB_FILENAME)
+
+
+def _get_conn() -> sqlite3.Connection:
+    """Lazily open the cache DB and create the schema."""
+    global _conn
+    if _conn is None:
+        _conn = sqlite3.connect(_db_path(), check_same_thread=False)
+        _conn.execute("PRAGMA journal_mode=WAL")
+        _conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "  key TEXT PRIMARY KEY,"
+            "  response TEXT NOT NULL,"
+            "  ts INTEGER NOT NULL"
+            ")"
+        )
+        _conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "  key TEXT PRIMARY KEY,"
+            "  embedding TEXT NOT NULL,"
+            "  response TEXT NOT NULL,"
+            "  ts INTEGER NOT NULL,"
+            "  model TEXT NOT NULL DEFAULT ''"
+            ")"
+        )
+        try:
+            # Migrate databases created before the model column existed;
+            # fails harmlessly once the column is there.
+            _conn.execute(
+                "ALTER TABLE embeddings ADD COLUMN model TEXT NOT NULL DEFAULT ''"
+            )
+        except sqlite3.Error:
+            pass
+        _conn.commit()
+    return _conn
+
+
+def make_key(model: str, system_prompt: str, prompt: str, temperature: float) -> str:
+    """Build the exact-match cache key for a generation request."""
+    raw = json.dumps([model, system_prompt, prompt, temperature], sort_keys=True)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def get(key: str) -> Optional[str]:
+    """Return the cached response for a key, or None on miss."""
+    try:
+        with _lock:
+            row = _get_conn().execute(
+                "SELECT response FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        return row[0] if row else None
+    except (sqlite3.Error, OSError):
+        # A broken cache should never break generation
+        return None
+
+
+def put(key: str, response: str, max_entries: int = DEFAULT_MAX_ENTRIES) -> None:
+    """Store a response, evicting oldest entries past max_entries."""
+    try:
+        with _lock:
+            conn = _get_conn()
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, response, ts) VALUES (?, ?, ?)",
+                (key, response, int(time.time())),
+            )
+            if max_entries > 0:
+                conn.execute(
+                    "DELETE FROM responses WHERE key IN ("
+                    "  SELECT key FROM responses ORDER BY ts DESC"
+                    "  LIMIT -1 OFFSET ?"
+                    ")",
+                    (max_entries,),
+                )
+            conn.commit()
+    except (sqlite3.Error, OSError):
+        pass
+
+
+def clear() -> None:
+    """Drop all cached responses."""
+    try:
+        with _lock:
+            conn = _get_conn()
+            conn.execute("DELETE FROM responses")
+            conn.execute("DELETE FROM embeddings")
+            conn.commit()
+        _invalidate_semantic_view()
+    except (sqlite3.Error, OSError):
+        pass
+
+
+# ─── Semantic Cache ────────────────────────────────────────────────
+
+DEFAULT_SEMANTIC_THRESHOLD = 0.95
+DEFAULT_EMBEDDING_MODEL = "nomic-embed-text"
+
+
+def embed(
+    base_url: str,
+    model: str,
+    text: str,
+    timeout: int = 30,
+) -> Optional[List[float]]:
+    """Embed text via Ollama's /api/embeddings. Returns None on any failure."""
+    payload = {"model": model, "prompt": text}
+    data = json.dumps(payload).encode("utf-8")
+    url = f"{base_url.rstrip('/')}/api/embeddings"
+    req = urllib.request.Request(
+        url, data=data, headers={"Content-Type": "application/json"}, method="POST"
+    )
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as response:
+            result = json.loads(response.read().decode("utf-8"))
+        embedding = result.get("embedding")
+        if isinstance(embedding, list) and embedding:
+            return embedding
+        return None
+    except Exception:
+        # Embedding failures must never break generation
+        return None
+
+
+def _cosine(a: List[float], b: List[float]) -> float:
+    """Cosine similarity between two vectors (pure Python fallback)."""
+    dot = sum(x * y for x, y in zip(a, b))
+    norm_a = math.sqrt(sum(x * x for x in a))
+    norm_b = math.sqrt(sum(x * x for x in b))
+    if norm_a == 0.0 or norm_b == 0.0:
+        return 0.0
+    return dot / (norm_a * norm_b)
+
+
+# In-memory view of the embeddings table, rebuilt lazily after inserts so
+# repeated lookups don't re-read sqlite or re-parse embedding JSON. With
+# NumPy the matrix is L2-normalized float32 and a lookup is one
+# matrix-vector product instead of a Python cosine loop per entry.
+# Guarded by _view_lock (separate from the sqlite _lock: the view loader
+# acquires _lock while holding _view_lock, never the other way around).
+_view_lock = threading.Lock()
+_emb_rows: Optional[list] = None     # [(embedding list, response), ...]
+_emb_matrix = None                   # np.ndarray [N, D], rows normalized
+_emb_responses: Optional[list] = None
+_emb_model: Optional[str] = None     # embedding model the view was built for
+
+
+def _invalidate_semantic_view() -> None:
+    global _emb_rows, _emb_matrix, _emb_responses, _emb_model
+    with _view_lock:
+        _emb_rows = None
+        _emb_matrix = None
+        _emb_responses = None
+        _emb_model = None
+
+
+def _append_semantic_view(
+    embedding: List[float], response: str, model: str
+) -> None:
+    """Extend the cached view in place after a plain insert.
+
+    Bulk fills interleave semantic_put and semantic_get per note, so
+    invalidating on every insert would make each lookup re-read the
+    whole table and re-parse every embedding. Appending keeps the view
+    warm; replaces and evictions (which remove rows) still invalidate.
+
+    The responses list is extended before the matrix is swapped in, so
+    a reader holding the old matrix never indexes past the end of the
+    responses list.
+    """
+    global _emb_matrix
+    with _view_lock:
+        if _emb_rows is None or _emb_model != model:
+            return  # not cached (or built for another model); lazy reload
+        _emb_rows.append((embedding, response))
+        if np is not None and _emb_matrix is not None:
+            row = np.asarray([embedding], dtype=np.float32)
+            norm = np.linalg.norm(row)
+            _emb_responses.append(response)
+            _emb_matrix = np.vstack([_emb_matrix, row / (norm or 1.0)])
+
+
+def _load_semantic_view(model: str) -> tuple:
+    """Return a consistent (rows, matrix, responses) view snapshot.
+
+    Loads and memoizes the embeddings stored for one embedding model;
+    rebuilt after invalidation or a model change. Scoping by model
+    keeps vectors of different dimensions out of the same matrix —
+    mixing them would break the matrix build and, worse, let the
+    pure-Python cosine silently compare truncated vectors. The parse
+    and matrix build run outside the locks — two threads racing the
+    first load do redundant work, but the published view is swapped in
+    atomically under _view_lock.
+    """
+    global _emb_rows, _emb_matrix, _emb_responses, _emb_model
+    with _view_lock:
+        if _emb_rows is not None and _emb_model == model:
+            return _emb_rows, _emb_matrix, _emb_responses
+    try:
+        with _lock:
+            raw = _get_conn().execute(
+                "SELECT embedding, response FROM embeddings WHERE model = ?",
+                (model,),
+            ).fetchall()
+    except (sqlite3.Error, OSError):
+        return [], None, None
+    rows = [(json.loads(e), r) for e, r in raw]
+    matrix = responses = None
+    if np is not None and rows:
+        mat = np.asarray([e for e, _ in rows], dtype=np.float32)
+        norms = np.linalg.norm(mat, axis=1, keepdims=True)
+        norms[norms == 0.0] = 1.0
+        matrix = mat / norms
+        responses = [r for _, r in rows]
+    with _view_lock:
+        if _emb_rows is None or _emb_model != model:
+            _emb_rows, _emb_matrix, _emb_responses = rows, matrix, responses
+            _emb_model = model
+        return _emb_rows, _emb_matrix, _emb_responses
+
+
+def semantic_get(
+    embedding: List[float],
+    threshold: float = DEFAULT_SEMANTIC_THRESHOLD,
+    model: str = "",
+) -> Optional[str]:
+    """Return the cached response most similar to the embedding, if any.
+
+    Only entries produced by the same embedding model are considered —
+    a different model's vectors live in a different space (and often a
+    different dimension), so comparing against them would be
+    meaningless at best. Uses one vectorized similarity pass over the
+    cached matrix when NumPy is available, otherwise a pure-Python
+    cosine loop (fine for cache-sized entry counts). Works on a
+    snapshot of the view, so concurrent appends from worker threads
+    cannot shift indices under the argmax.
+    """
+    rows, matrix, responses = _load_semantic_view(model)
+    if not rows:
+        return None
+
+    if np is not None and matrix is not None:
+        if matrix.shape[1] != len(embedding):
+            return None
+        q = np.asarray(embedding, dtype=np.float32)
+        qn = np.linalg.norm(q)
+        if qn == 0.0:
+            return None
+        sims = matrix @ (q / qn)
+        best = int(sims.argmax())
+        if float(sims[best]) >= threshold:
+            return responses[best]
+        return None
+
+    best_sim = 0.0
+    best_response = None
+    for emb, response in rows:
+        if len(emb) != len(embedding):
+            continue  # zip would silently truncate the longer vector
+        sim = _cosine(embedding, emb)
+        if sim > best_sim:
+            best_sim = sim
+            best_response = response
+    if best_sim >= threshold:
+        return best_response
+    return None
+
+
+def semantic_put(
+    key: str,
+    embedding: List[float],
+    response: str,
+    max_entries: int = DEFAULT_MAX_ENTRIES,
+    model: str = "",
+) -> None:
+    """Store an embedding + response, evicting oldest entries past max_entries.
+
+    model records which embedding model produced the vector, so lookups
+    never compare vectors from different embedding spaces.
+    """
+    try:
+        with _lock:
+            conn = _get_conn()
+            replaced = conn.execute(
+                "SELECT 1 FROM embeddings WHERE key = ?", (key,)
+            ).fetchone() is not None
+            conn.execute(
+                "INSERT OR REPLACE INTO embeddings"
+                " (key, embedding, response, ts, model)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (key, json.dumps(embedding), response, int(time.time()), model),
+            )
+            evicted = 0
+            if max_entries > 0:
+                evicted = conn.execute(
+                    "DELETE FROM embeddings WHERE key IN ("
+                    "  SELECT key FROM embeddings ORDER BY ts DESC"
+                    "  LIMIT -1 OFFSET ?"
+                    ")",
+                    (max_entries,),
+                ).rowcount
+            conn.commit()
+        if replaced or evicted:
+            _invalidate_semantic_view()
+        else:
+            _append_semantic_view(embedding, response, model)
+    except (sqlite3.Error, OSError):
+        pass
@@ -1,8 +1,93 @@
 # Anki LLM Field Generator
 # Prompt template engine
 
+import functools
 import re
-from typing import Dict
+import sys
+from typing import Callable, Dict, Iterable, List, Tuple
+
+# Matches {{Field Name}} placeholders (field names may contain spaces)
+_PLACEHOLDER_RE = re.compile(r"\{\{([^{}]+)\}\}")
+
+
+def _lookup(note_fields: Dict[str, str], name: str) -> str:
+    """Resolve one placeholder; unknown fields are left as-is."""
+    return note_fields[name] if name in note_fields else "{{" + name + "}}"
+
+
+def _tokenize(template: str) -> Tuple[List[str], List[str]]:
+    """Split a template into literal runs and placeholder names.
+
+    Matches _PLACEHOLDER_RE's semantics ({{...}} with no braces in the
+    name) but scans with str.find, which dispatches to CPython's C
+    substring search instead of the regex engine — compiling is cheap
+    enough to do inline for one-off templates. Names are interned so
+    render-time dict lookups hit the pointer-equality fast path.
+
+    Returns (literals, names) with len(literals) == len(names) + 1;
+    literals[i] precedes names[i].
+    """
+    literals: List[str] = []
+    names: List[str] = []
+    pending: List[str] = []  # literal pieces since the last placeholder
+    i, n = 0, len(template)
+    while i < n:
+        j = template.find("{{", i)
+        if j < 0:
+            pending.append(template[i:])
+            break
+        k = template.find("}}", j + 2)
+        if k < 0:
+            pending.append(template[i:])
+            break
+        name = template[j + 2:k]
+        if name and "{" not in name and "}" not in name:
+            pending.append(template[i:j])
+            literals.append("".join(pending))
+            pending = []
+            names.append(sys.intern(name))
+            i = k + 2
+        else:
+            # Not a placeholder (empty or brace-containing name).
+            # Advance a single character so an overlapping opener —
+            # as in "{{{a}}}" — is still found, matching the regex.
+            pending.append(template[i:j + 1])
+            i = j + 1
+    literals.append("".join(pending))
+    return literals, names
+
+
+@functools.lru_cache(maxsize=400)
+def compile_template(template: str) -> Callable[[Dict[str, str]], str]:
+    """Compile a template into a reusable render callable.
+
+    The template is parsed once and cached; bulk fills render the same
+    handful of templates for every note, so repeat calls skip parsing
+    entirely. Placeholders without a matching field are left as-is.
+
+    Rendering is a generated expression — literal segments baked in as
+    constants, one _lookup call per placeholder — so repeat renders
+    run straight-line string concatenation in bytecode with no
+    Python-level loop over segments. A template with no placeholders
+    renders as a constant.
+    """
+    literals, names = _tokenize(template)
+    if not names:
+        return lambda note_fields: template
+
+    # Empty literals (template starts/ends with a placeholder, or
+    # adjacent placeholders) are dropped rather than concatenated.
+    pieces = []
+    for literal, name in zip(literals, names):
+        if literal:
+            pieces.append(repr(literal))
+        pieces.append(f"_get(f, {name!r})")
+    if literals[-1]:
+        pieces.append(repr(literals[-1]))
+    src = "def render(f, _get=_lookup): return " + " + ".join(pieces)
+    namespace = {"_lookup": _lookup}
+    exec(compile(src, "<prompt template>", "exec"), namespace)
+    return namespace["render"]
 
 
 def build_prompt(template: str, note_fields: Dict[str, str]) -> str:
@@ -22,11 +107,19 @@ def build_prompt(template: str, note_fields: Dict[str, str]) -> str:
         ... )
         'Define "食べる" in Japanese.'
     """
-    result = template
-    for field_name, field_value in note_fields.items():
-        placeholder = "{{" + field_name + "}}"
-        result = result.replace(placeholder, field_value)
-    return result
+    return compile_template(template)(note_fields)
+
+
+def build_prompts_batch(template: str, notes: Iterable) -> List[str]:
+    """Render one template against many notes.
+
+    Bulk fills call this with the shared template so all per-template
+    work — the parse, the generated renderer, the literal segments —
+    is done once and hoisted out of the per-note loop. Each note then
+    costs one fields-dict build plus the compiled render.
+    """
+    render = compile_template(template)
+    return [render(get_note_fields_dict(note)) for note in notes]
 
 
 def get_note_fields_dict(note) -> Dict[str, str]:
@@ -38,8 +131,14 @@ def get_note_fields_dict(note) -> Dict[str, str]:
     Returns:
         Dict mapping field names to their string values.
     """
-    field_names = [f["name"] for f in note.note_type()["flds"]]
-    return {name: note[name] for name in field_names}
+    # note.items() pairs names with values in one pass; indexing
+    # note[name] instead would re-resolve each name to its field
+    # position, making the old loop quadratic in the field count.
+    try:
+        return dict(note.items())
+    except AttributeError:
+        field_names = [f["name"] for f in note.note_type()["flds"]]
+        return dict(zip(field_names, note.fields))
 
 
 def validate_template(template: str, available_fields: list) -> list:
@@ -48,6 +147,7 @@ def validate_template(template: str, available_fields: list) -> list:
     Returns:
         List of invalid placeholder names (empty if all are valid).
     """
-    placeholders = re.findall(r"\{\{(\w+)\}\}", template)
-    invalid = [p for p in placeholders if p not in available_fields]
+    placeholders = _PLACEHOLDER_RE.findall(template)
+    available = frozenset(available_fields)
+    invalid = [p for p in placeholders if p not in available]
     return invalid